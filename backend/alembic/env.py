@@ -15,6 +15,9 @@ load_dotenv()
 # Import models and Base
 from app.models.task import Task
 from app.models.project import Project
+from app.models.tombstone import Tombstone
+from app.models.project_stats import ProjectStats
+from app.models.admin_job import AdminJob
 from app.database import Base
 
 # Alembic Config object
@@ -0,0 +1,31 @@
+"""Add keyset pagination indexes
+
+Revision ID: add_pagination_indexes
+Revises: add_last_accessed
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_pagination_indexes'
+down_revision = 'add_last_accessed'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_tasks_project_id_updated_at_id',
+        'tasks',
+        ['project_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_projects_last_accessed_id',
+        'projects',
+        [sa.text('last_accessed DESC'), sa.text('id DESC')],
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_last_accessed_id', table_name='projects')
+    op.drop_index('ix_tasks_project_id_updated_at_id', table_name='tasks')
@@ -0,0 +1,102 @@
+"""Maintain per-project task counters with triggers
+
+Revision ID: add_project_stats
+Revises: add_tombstones
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_project_stats'
+down_revision = 'add_tombstones'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'project_stats',
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task_count', sa.Integer(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('last_activity_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id'),
+    )
+    # One set-based delta per statement. Inserts and updates upsert (their projects
+    # exist); deletes only update, since the project row may be going away with them.
+    # Each branch only names the transition tables its trigger declares.
+    op.execute("""
+        CREATE FUNCTION apply_task_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                UPDATE project_stats s
+                SET task_count = s.task_count - d.task_count,
+                    completed_count = s.completed_count - d.completed_count,
+                    last_activity_at = now()
+                FROM (
+                    SELECT project_id, count(*) AS task_count, count(*) FILTER (WHERE completed) AS completed_count
+                    FROM old_rows WHERE project_id IS NOT NULL GROUP BY project_id
+                ) d
+                WHERE s.project_id = d.project_id;
+            ELSIF TG_OP = 'INSERT' THEN
+                INSERT INTO project_stats AS s (project_id, task_count, completed_count, last_activity_at)
+                SELECT project_id, count(*), count(*) FILTER (WHERE completed), max(updated_at)
+                FROM new_rows WHERE project_id IS NOT NULL GROUP BY project_id
+                ON CONFLICT (project_id) DO UPDATE
+                SET task_count = s.task_count + EXCLUDED.task_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count,
+                    last_activity_at = greatest(s.last_activity_at, EXCLUDED.last_activity_at);
+            ELSE
+                INSERT INTO project_stats AS s (project_id, task_count, completed_count, last_activity_at)
+                SELECT project_id, sum(task_count), sum(completed_count), max(activity)
+                FROM (
+                    SELECT n.project_id, 1 AS task_count, CASE WHEN n.completed THEN 1 ELSE 0 END AS completed_count,
+                           n.updated_at AS activity
+                    FROM new_rows n
+                    UNION ALL
+                    SELECT o.project_id, -1, CASE WHEN o.completed THEN -1 ELSE 0 END, n.updated_at
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                ) d
+                WHERE project_id IS NOT NULL
+                GROUP BY project_id
+                ON CONFLICT (project_id) DO UPDATE
+                SET task_count = s.task_count + EXCLUDED.task_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count,
+                    last_activity_at = greatest(s.last_activity_at, EXCLUDED.last_activity_at);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_task_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_update AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_task_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_task_stats()
+    """)
+    # Backfill from existing data
+    op.execute("""
+        INSERT INTO project_stats (project_id, task_count, completed_count, last_activity_at)
+        SELECT p.id, count(t.id), count(t.id) FILTER (WHERE t.completed), max(t.updated_at)
+        FROM projects p LEFT JOIN tasks t ON t.project_id = p.id
+        GROUP BY p.id
+    """)
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER tasks_stats_delete ON tasks")
+    op.execute("DROP TRIGGER tasks_stats_update ON tasks")
+    op.execute("DROP TRIGGER tasks_stats_insert ON tasks")
+    op.execute("DROP FUNCTION apply_task_stats()")
+    op.drop_table('project_stats')
@@ -0,0 +1,26 @@
+"""Cascade project deletes to their tasks in the database
+
+Revision ID: add_task_project_cascade
+Revises: add_project_stats
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_task_project_cascade'
+down_revision = 'add_project_stats'
+branch_labels = None
+depends_on = None
+
+FK_NAME = 'tasks_project_id_fkey'
+
+def upgrade() -> None:
+    # Deleting a project becomes one statement; Postgres removes its tasks in the
+    # same pass instead of the ORM loading and deleting them row by row
+    op.drop_constraint(FK_NAME, 'tasks', type_='foreignkey')
+    op.create_foreign_key(FK_NAME, 'tasks', 'projects', ['project_id'], ['id'], ondelete='CASCADE')
+
+def downgrade() -> None:
+    op.drop_constraint(FK_NAME, 'tasks', type_='foreignkey')
+    op.create_foreign_key(FK_NAME, 'tasks', 'projects', ['project_id'], ['id'])
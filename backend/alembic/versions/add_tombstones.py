@@ -0,0 +1,54 @@
+"""Record deleted projects and tasks for incremental exports
+
+Revision ID: add_tombstones
+Revises: add_task_search_vector
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_tombstones'
+down_revision = 'add_task_search_vector'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ('projects', 'tasks')
+
+def upgrade() -> None:
+    op.create_table(
+        'tombstones',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('row_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('table_name', 'row_id'),
+    )
+    op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'])
+    # Statement-level with a transition table: one INSERT per DELETE statement,
+    # however many rows it (or an FK cascade) removes
+    op.execute("""
+        CREATE FUNCTION record_tombstones() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO tombstones (table_name, row_id)
+            SELECT TG_TABLE_NAME, id FROM deleted_rows
+            ON CONFLICT (table_name, row_id) DO UPDATE SET deleted_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TRACKED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_tombstones
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS deleted_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_tombstones()
+        """)
+
+def downgrade() -> None:
+    for table in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER {table}_tombstones ON {table}")
+    op.execute("DROP FUNCTION record_tombstones()")
+    op.drop_index('ix_tombstones_deleted_at', table_name='tombstones')
+    op.drop_table('tombstones')
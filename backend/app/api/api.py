@@ -1,7 +1,8 @@
 from fastapi import APIRouter
-from .endpoints import tasks, projects, admin
+from .endpoints import tasks, projects, admin, events
 
 api_router = APIRouter()
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
-api_router.include_router(admin.router, prefix="/admin", tags=["admin"]) 
\ No newline at end of file
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(events.router, prefix="/events", tags=["events"]) 
\ No newline at end of file
@@ -1,54 +1,207 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from ...database import get_db
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
+from ...database import AdminSessionLocal, pool_stats
+from ...crud.project import reconcile_project_stats
 from ...models.project import Project
 from ...models.task import Task
-from ...utils.admin import export_model_to_csv, parse_row
+from ...models.tombstone import Tombstone
+from ...utils.admin import (
+    IMPORT_COMMIT_ROWS, export_models, stream_model_csv, import_file, apply_tombstones,
+    read_watermark, write_watermark,
+)
+from ...utils.cache import response_cache
+from ...utils.events import notify_reset
+from ...utils.jobs import Job, job_runner
 from datetime import datetime, timezone
-import csv
-from io import StringIO
-import uuid
+from typing import Literal, Optional
+import asyncio
+import os
+import shutil
+import tempfile
+import time
 from sqlalchemy import text
 
 router = APIRouter()
 
-@router.get("/export/", tags=["admin"])
-async def export_tables(db: AsyncSession = Depends(get_db)):
+TABLE_MAP = {
+    'projects': Project,
+    'tasks': Task,
+}
+
+@router.get("/export/", status_code=202, tags=["admin"])
+async def export_tables(
+    mode: Literal["full", "incremental"] = "full",
+    since: Optional[datetime] = None,
+    format: Literal["csv", "parquet"] = "csv",
+):
+    """Queue a full dump, or only changes (and deletions) since `since` / the last export's watermark.
+
+    Parquet files keep column types and are zstd-compressed; importing them needs no parsing.
+    """
+
+    async def run(job: Job):
+        nonlocal mode, since
+        if mode == "incremental" and since is None:
+            since = await read_watermark()
+        if mode == "full" or since is None:
+            # Nothing to be incremental from yet: take a full export as the base
+            mode, since = "full", None
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        exported, watermark = await export_models(
+            list(TABLE_MAP.values()), timestamp, since=since, progress=job.progress, format=format
+        )
+        await write_watermark(watermark, exported)
+        return {"exported": exported, "mode": mode, "format": format, "since": since, "watermark": watermark}
+
+    return (await job_runner.submit("export", run)).to_dict()
+
+@router.get("/export/{table}", tags=["admin"])
+async def download_table(table: str, compress: bool = False):
+    model = TABLE_MAP.get(table)
+    if not model:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
     timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-    models = [Project, Task]
-    exported = []
-    for model in models:
-        exported.append(await export_model_to_csv(db, model, timestamp))
-    return {"exported": exported}
-
-@router.post("/import/", tags=["admin"])
-async def import_tables(files: list[UploadFile] = File(...), db: AsyncSession = Depends(get_db)):
-    table_map = {
-        'projects': Project,
-        'tasks': Task,
-    }
-    try:
-        async with db.begin():
-            for file in files:
-                name = file.filename.split('_')[0].lower()
-                model = table_map.get(name)
-                if not model:
-                    raise HTTPException(status_code=400, detail=f"Unknown table for file: {file.filename}")
-                content = await file.read()
-                reader = csv.DictReader(StringIO(content.decode('utf-8')))
-                for row in reader:
-                    obj = model(**parse_row(model, row))
-                    db.add(obj)
-        return {"imported": [file.filename for file in files]}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Import failed: {str(e)}")
-
-@router.post("/delete_all/", tags=["admin"])
-async def delete_all_data(db: AsyncSession = Depends(get_db)):
-    try:
-        async with db.begin():
-            await db.execute(text("DELETE FROM tasks"))
-            await db.execute(text("DELETE FROM projects"))
+    filename = f"{table}_{timestamp}.csv" + (".gz" if compress else "")
+    return StreamingResponse(
+        stream_model_csv(model, compress=compress),
+        media_type="application/gzip" if compress else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+def _spool(file, filename: str) -> tuple[str, int]:
+    """Copy an upload to a temp file that outlives the request; returns (path, size)."""
+    suffix = os.path.splitext(filename)[1]
+    with tempfile.NamedTemporaryFile(prefix="import_", suffix=suffix, delete=False) as out:
+        shutil.copyfileobj(file, out, 1024 * 1024)
+        return out.name, out.tell()
+
+def _remove(paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+@router.post("/import/", status_code=202, tags=["admin"])
+async def import_tables(
+    files: list[UploadFile] = File(...),
+    on_conflict: Literal["fail", "update", "skip"] = "fail",
+    mode: Literal["full", "delta"] = "full",
+):
+    """Queue a load of CSV or Parquet (`.parquet`) exports.
+
+    A delta (from an incremental export) is upserted and its tombstones applied.
+
+    The job commits every IMPORT_COMMIT_ROWS rows; a failure keeps what was committed before it.
+    """
+    tables = list(TABLE_MAP)
+    uploads, tombstones = [], []
+    for file in files:
+        name = file.filename.split('_')[0].lower()
+        if name == Tombstone.__tablename__ and mode == "delta":
+            tombstones.append(file)
+        elif name not in TABLE_MAP:
+            raise HTTPException(status_code=400, detail=f"Unknown table for file: {file.filename}")
+        else:
+            uploads.append((name, file))
+    if mode == "delta":
+        # Deltas overlap earlier ones and may be replayed, so they must be idempotent
+        on_conflict = "update"
+    # Parents before children so foreign keys resolve; tombstones last
+    uploads.sort(key=lambda item: tables.index(item[0]))
+    ordered = [*uploads, *((None, file) for file in tombstones)]
+    # Request uploads are closed once this handler returns, so the job reads its own copies
+    spooled = [(name, file.filename, *await asyncio.to_thread(_spool, file.file, file.filename)) for name, file in ordered]
+
+    async def run(job: Job):
+        started = time.perf_counter()
+        results = []
+        async with AdminSessionLocal() as db:
+            try:
+                for name, filename, path, _ in spooled:
+                    upload = UploadFile(await asyncio.to_thread(open, path, 'rb'), filename=filename)
+                    try:
+                        if name is None:
+                            results.append(await apply_tombstones(db, upload, list(TABLE_MAP.values())))
+                        else:
+                            results.append(await import_file(
+                                db, TABLE_MAP[name], upload, on_conflict=on_conflict,
+                                commit_every=IMPORT_COMMIT_ROWS, progress=job.progress,
+                            ))
+                    finally:
+                        await asyncio.to_thread(upload.file.close)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            finally:
+                # Earlier chunks may have committed even if a later one failed
+                await notify_reset(db)
+                await db.commit()
+                await response_cache.clear()
+        elapsed = time.perf_counter() - started
+        total = sum(result["rows"] for result in results)
+        return {
+            "imported": [filename for _, filename, _, _ in spooled],
+            "files": results,
+            "rows": total,
+            "rows_per_sec": round(total / elapsed) if elapsed else total,
+        }
+
+    job = await job_runner.submit(
+        "import", run,
+        total_bytes=sum(size for *_, size in spooled),
+        cleanup=lambda: _remove([path for _, _, path, _ in spooled]),
+    )
+    return job.to_dict()
+
+@router.post("/delete_all/", status_code=202, tags=["admin"])
+async def delete_all_data():
+    async def run(job: Job):
+        async with AdminSessionLocal() as db:
+            async with db.begin():
+                # TRUNCATE skips the row-level work of DELETE but also the tombstone
+                # triggers, so record the deletions for incremental exports first
+                await db.execute(text("""
+                    INSERT INTO tombstones (table_name, row_id)
+                    SELECT 'tasks', id FROM tasks
+                    UNION ALL
+                    SELECT 'projects', id FROM projects
+                    ON CONFLICT (table_name, row_id) DO UPDATE SET deleted_at = now()
+                """))
+                await db.execute(text("TRUNCATE tasks, projects, project_stats"))
+                await notify_reset(db)
+        await response_cache.clear()
         return {"message": "All data deleted"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}") 
\ No newline at end of file
+
+    return (await job_runner.submit("delete_all", run)).to_dict()
+
+@router.post("/reconcile_stats/", status_code=202, tags=["admin"])
+async def reconcile_stats():
+    """Queue a recount of the per-project task counters."""
+    async def run(job: Job):
+        async with AdminSessionLocal() as db:
+            return {"repaired": await reconcile_project_stats(db)}
+
+    return (await job_runner.submit("reconcile_stats", run)).to_dict()
+
+@router.get("/jobs/", tags=["admin"])
+async def list_jobs():
+    """Recent admin jobs of all workers, newest first."""
+    return [job.to_dict() for job in await job_runner.recent()]
+
+@router.get("/jobs/{job_id}", tags=["admin"])
+async def read_job(job_id: str):
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/cache/", tags=["admin"])
+async def cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/pool/", tags=["admin"])
+async def connection_pool_stats():
+    return pool_stats()
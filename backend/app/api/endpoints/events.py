@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from uuid import UUID
+from ...utils.events import change_feed, stream_events
+
+router = APIRouter()
+
+@router.get("/")
+async def read_events(
+    request: Request,
+    project_id: Optional[UUID] = None,
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    # Browsers send Last-Event-ID on automatic reconnects; the query param covers manual resumes
+    subscription = change_feed.subscribe(project_id, last_event_id_header or last_event_id)
+    return StreamingResponse(
+        stream_events(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,37 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional, Union
 from uuid import UUID
 
-from ...database import get_db
+from ...database import AdminSessionLocal, get_db, get_read_db
 from ...crud import project as project_crud
 from ...crud import task as task_crud
-from ...schemas.project import Project, ProjectCreate, ProjectUpdate
+from ...schemas.project import Project, ProjectCreate, ProjectSummary, ProjectUpdate, ProjectStats, FleetStats
 from ...schemas.task import Task, TaskCreate
+from ...utils.pagination import Cursor, NEXT_CURSOR_HEADER, cursor_param, next_cursor
+from ...utils.touches import touch_aggregator
+from ...utils.cache import read_through, project_key, project_tasks_key
+from ...utils.etag import make_etag, not_modified
+from ...utils.serialization import json_response
+from ...utils.projection import hidden_fields, parse_fields
+from ...utils.jobs import Job, job_runner
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Project])
-async def read_projects(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    projects = await project_crud.get_projects(db, skip=skip, limit=limit)
-    return projects
+FULL_FIELDS = (*project_crud.PROJECT_FIELDS, "tasks", *(f"tasks.{field}" for field in task_crud.TASK_FIELDS))
+SUMMARY_FIELDS = (*project_crud.PROJECT_FIELDS, *project_crud.SUMMARY_COUNT_FIELDS)
+
+@router.get("/", response_model=Union[List[ProjectSummary], List[Project]])
+async def read_projects(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    view: Literal["full", "summary"] = "full",
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return; in the full view `tasks` or `tasks.<field>` embeds tasks"
+    ),
+    db: AsyncSession = Depends(get_read_db)
+):
+    allowed = SUMMARY_FIELDS if view == "summary" else FULL_FIELDS
+    fields = parse_fields(fields, allowed)
+    etag = make_etag(
+        "projects", await project_crud.projects_fingerprint(db, skip, limit, cursor), view, skip, limit, cursor, fields
+    )
+    if unchanged := not_modified(request, etag):
+        return unchanged
+    if view == "summary":
+        projects = await project_crud.get_project_summaries(db, skip=skip, limit=limit, cursor=cursor, fields=fields)
+    else:
+        projects = await project_crud.get_projects(db, skip=skip, limit=limit, cursor=cursor, fields=fields)
+    headers = {"ETag": etag}
+    if next_page := next_cursor(projects, limit, "last_accessed"):
+        headers[NEXT_CURSOR_HEADER] = next_page
+    # last_accessed (and id, unless asked for) are only selected for the cursor
+    return json_response(projects, headers, exclude=("last_accessed", *hidden_fields(fields, ("id",))))
 
 @router.post("/", response_model=Project)
 async def create_project(project: ProjectCreate, db: AsyncSession = Depends(get_db)):
     return await project_crud.create_project(db=db, project=project)
 
+# Declared before /{project_id} so "stats" is not parsed as a project id
+@router.get("/stats", response_model=FleetStats)
+async def read_fleet_stats(db: AsyncSession = Depends(get_read_db)):
+    return await project_crud.get_fleet_stats(db)
+
 @router.get("/{project_id}", response_model=Project)
 async def read_project(
     project_id: UUID,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    db_project = await project_crud.get_project(db, project_id)
-    if db_project is None:
+    fingerprint = await project_crud.project_fingerprint(db, project_id)
+    if fingerprint is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    background_tasks.add_task(project_crud.touch_project, db, project_id)
-    return db_project
+    touch_aggregator.touch(project_id)
+    etag = make_etag("project", project_id, fingerprint)
+    if unchanged := not_modified(request, etag):
+        return unchanged
+    cached = await read_through(
+        project_key(project_id),
+        lambda: project_crud.get_project_detail(db, project_id),
+        to_json,
+        variant=etag,
+    )
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    cached.headers["ETag"] = etag
+    return cached
 
 @router.put("/{project_id}", response_model=Project)
 async def update_project(project_id: UUID, project: ProjectUpdate, db: AsyncSession = Depends(get_db)):
@@ -41,32 +92,73 @@ async def update_project(project_id: UUID, project: ProjectUpdate, db: AsyncSess
     return db_project
 
 @router.delete("/{project_id}")
-async def delete_project(project_id: UUID, db: AsyncSession = Depends(get_db)):
+async def delete_project(project_id: UUID, response: Response, background: bool = False, db: AsyncSession = Depends(get_db)):
+    """Delete a project and its tasks in one statement.
+
+    With `background=true` the tasks are removed in committed chunks by an admin
+    job instead (for very large projects); returns `202` with the job to poll.
+    """
+    if background:
+        if await project_crud.project_fingerprint(db, project_id) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        async def run(job: Job):
+            async with AdminSessionLocal() as admin_db:
+                tasks = await project_crud.delete_project_chunked(
+                    admin_db, project_id, progress=lambda rows: job.progress(rows=rows)
+                )
+            return {"message": "Project deleted successfully", "tasks_deleted": tasks}
+
+        response.status_code = 202
+        return (await job_runner.submit("delete_project", run)).to_dict()
     success = await project_crud.delete_project(db, project_id=project_id)
     if not success:
         raise HTTPException(status_code=404, detail="Project not found")
     return {"message": "Project deleted successfully"}
 
+@router.get("/{project_id}/stats", response_model=ProjectStats)
+async def read_project_stats(project_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    stats = await project_crud.get_project_stats(db, project_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return stats
+
 @router.get("/{project_id}/tasks", response_model=List[Task])
 async def read_project_tasks(
     project_id: UUID,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    db_project = await project_crud.get_project(db, project_id)
-    if db_project is None:
+    fingerprint = await project_crud.project_fingerprint(db, project_id)
+    if fingerprint is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    background_tasks.add_task(project_crud.touch_project, db, project_id)
-    tasks = await task_crud.get_tasks_by_project(db, project_id)
-    return tasks
+    touch_aggregator.touch(project_id)
+    # Only the task part of the fingerprint affects this list
+    etag = make_etag("project_tasks", project_id, fingerprint[1:], skip, limit, cursor)
+    if unchanged := not_modified(request, etag):
+        return unchanged
+
+    def headers(tasks):
+        next_page = next_cursor(tasks, limit, "updated_at")
+        return {NEXT_CURSOR_HEADER: next_page} if next_page else {}
+
+    cached = await read_through(
+        project_tasks_key(project_id),
+        lambda: task_crud.get_tasks_by_project(db, project_id, skip=skip, limit=limit, cursor=cursor),
+        to_json,
+        variant=etag, headers=headers,
+    )
+    cached.headers["ETag"] = etag
+    return cached
 
 @router.post("/{project_id}/tasks", response_model=Task)
 async def create_project_task(project_id: UUID, task: TaskCreate, db: AsyncSession = Depends(get_db)):
-    db_project = await project_crud.get_project(db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
     task_data = task.model_dump()
     task_data["project_id"] = project_id
     new_task = await task_crud.create_task(db, TaskCreate(**task_data))
+    if new_task is None:
+        raise HTTPException(status_code=404, detail="Project not found")
     return new_task 
\ No newline at end of file
@@ -1,33 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from ...database import get_db
+from ...database import get_db, get_read_db
 from ...crud import task as task_crud
-from ...schemas.task import Task, TaskCreate, TaskUpdate
+from ...schemas.task import Task, TaskCreate, TaskUpdate, TaskBatch, TaskBatchResult, TaskSearchResult
 from ...crud import project as project_crud
+from ...utils.pagination import Cursor, NEXT_CURSOR_HEADER, cursor_param, rank_cursor_param, encode_cursor, next_cursor
+from ...utils.cache import read_through, task_key
+from ...utils.etag import make_etag, not_modified
+from ...utils.serialization import json_response
+from ...utils.projection import hidden_fields, parse_fields
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Task])
-async def read_tasks(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    tasks = await task_crud.get_tasks(db, skip=skip, limit=limit)
-    return tasks
+async def read_tasks(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Cursor] = Depends(cursor_param),
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return, e.g. id,title,completed"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    fields = parse_fields(fields, task_crud.TASK_FIELDS)
+    etag = make_etag("tasks", await task_crud.tasks_fingerprint(db), skip, limit, cursor, fields)
+    if unchanged := not_modified(request, etag):
+        return unchanged
+    tasks = await task_crud.get_tasks(db, skip=skip, limit=limit, cursor=cursor, fields=fields)
+    headers = {"ETag": etag}
+    if next_page := next_cursor(tasks, limit, "updated_at"):
+        headers[NEXT_CURSOR_HEADER] = next_page
+    return json_response(tasks, headers, exclude=hidden_fields(fields, task_crud.TASK_PAGE_FIELDS))
 
 @router.post("/", response_model=Task)
 async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):
-    return await task_crud.create_task(db=db, task=task)
+    db_task = await task_crud.create_task(db=db, task=task)
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return db_task
+
+@router.post("/batch", response_model=List[TaskBatchResult])
+async def batch_tasks(batch: TaskBatch, db: AsyncSession = Depends(get_db)):
+    try:
+        return await task_crud.apply_task_batch(db, batch.operations)
+    except task_crud.ProjectNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/search", response_model=List[TaskSearchResult])
+async def search_tasks(
+    q: str = Query(..., min_length=1),
+    project_id: Optional[UUID] = None,
+    completed: Optional[bool] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[Cursor] = Depends(rank_cursor_param),
+    db: AsyncSession = Depends(get_read_db)
+):
+    rows = await task_crud.search_tasks(
+        db, q, project_id=project_id, completed=completed, limit=limit, cursor=cursor
+    )
+    headers = {}
+    if len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+    return json_response(rows, headers)
 
 @router.get("/{task_id}", response_model=Task)
-async def read_task(task_id: UUID, db: AsyncSession = Depends(get_db)):
-    db_task = await task_crud.get_task(db, task_id=task_id)
-    if db_task is None:
+async def read_task(task_id: UUID, request: Request, db: AsyncSession = Depends(get_read_db)):
+    updated_at = await task_crud.task_fingerprint(db, task_id)
+    if updated_at is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return db_task
+    etag = make_etag("task", task_id, updated_at)
+    if unchanged := not_modified(request, etag):
+        return unchanged
+    cached = await read_through(task_key(task_id), lambda: task_crud.get_task_detail(db, task_id), to_json, variant=etag)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    cached.headers["ETag"] = etag
+    return cached
 
 @router.put("/{task_id}", response_model=Task)
 async def update_task(task_id: UUID, task: TaskUpdate, db: AsyncSession = Depends(get_db)):
-    db_task = await task_crud.update_task(db, task_id=task_id, task=task)
+    try:
+        db_task = await task_crud.update_task(db, task_id=task_id, task=task)
+    except task_crud.ProjectNotFound:
+        raise HTTPException(status_code=404, detail="Project not found")
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
@@ -0,0 +1,16 @@
+"""Recount project_stats from tasks and repair any drift.
+
+    uv run python -m app.commands.reconcile_stats
+"""
+import asyncio
+from ..crud.project import reconcile_project_stats
+from ..database import AdminSessionLocal, admin_engine
+
+async def main():
+    async with AdminSessionLocal() as db:
+        repaired = await reconcile_project_stats(db)
+    await admin_engine.dispose()
+    print(f"Repaired {repaired} project_stats rows")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""Production server: several uvicorn workers, no reload, graceful shutdown.
+
+    uv run python -m app.commands.serve
+"""
+import copy
+import importlib.util
+import os
+import uvicorn
+from dotenv import load_dotenv
+from uvicorn.config import LOGGING_CONFIG
+
+load_dotenv()
+
+def _cpu_count() -> int:
+    # Cores this process may run on (respects CPU affinity, e.g. in containers)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Each worker has its own pools: plan for WEB_CONCURRENCY x (DB_POOL_SIZE +
+# DB_MAX_OVERFLOW + DB_ADMIN_POOL_SIZE + 1 LISTEN) Postgres connections (see README)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or _cpu_count())
+# After SIGTERM, seconds in-flight requests (including open event streams) get to finish
+GRACEFUL_SHUTDOWN_TIMEOUT = float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+ACCESS_LOG = os.getenv("ACCESS_LOG", "false").lower() in ("true", "1", "yes")
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def main():
+    log_config = copy.deepcopy(LOGGING_CONFIG)
+    # Show the app's own INFO logs (e.g. each worker's startup time) alongside uvicorn's
+    log_config["loggers"]["app"] = {"handlers": ["default"], "level": "INFO", "propagate": False}
+    uvicorn.run(
+        "app.main:app",
+        host=HOST,
+        port=PORT,
+        workers=WEB_CONCURRENCY,
+        loop="uvloop" if _available("uvloop") else "asyncio",
+        http="httptools" if _available("httptools") else "h11",
+        lifespan="on",
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+        access_log=ACCESS_LOG,
+        log_config=log_config,
+    )
+
+if __name__ == "__main__":
+    main()
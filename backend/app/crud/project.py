@@ -1,60 +1,283 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, delete, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, desc, delete, insert, update, tuple_, any_, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql import func
+import os
+from typing import Callable, Dict, Iterable, List, Optional
 from uuid import UUID
 from ..models.project import Project
+from ..models.task import Task
+from ..models.project_stats import ProjectStats
 from ..schemas.project import ProjectCreate, ProjectUpdate
+from ..utils.pagination import Cursor
+from ..utils.cache import invalidate, task_key, project_key, project_tasks_key
+from ..utils.events import notify_change
+from ..utils.serialization import rows_to_dicts
+from ..utils.projection import Fields, nested_fields, select_fields
+from .task import TASK_COLUMNS
 
-async def get_projects(db: AsyncSession, skip: int = 0, limit: int = 100):
+# Tasks removed per transaction by delete_project_chunked
+PROJECT_DELETE_CHUNK_SIZE = int(os.getenv("PROJECT_DELETE_CHUNK_SIZE", "5000"))
+
+# Read-path columns, in schemas.project.Project field order so rows serialize straight to JSON
+PROJECT_COLUMNS = (Project.name, Project.description, Project.id, Project.created_at, Project.updated_at)
+PROJECT_FIELDS = tuple(column.key for column in PROJECT_COLUMNS)
+SUMMARY_COUNT_FIELDS = ("task_count", "completed_count")
+
+def _page(query, skip: int, limit: int, cursor: Optional[Cursor]):
+    """Order most recently accessed first; seek past the cursor when given, otherwise offset."""
+    query = query.order_by(desc(Project.last_accessed), desc(Project.id)).limit(limit)
+    if cursor is not None:
+        return query.where(tuple_(Project.last_accessed, Project.id) < tuple_(*cursor))
+    return query.offset(skip)
+
+async def _tasks_by_project(db: AsyncSession, project_ids: List[UUID], fields: Optional[Fields] = None) -> Dict[UUID, List[dict]]:
+    """Tasks of several projects in one query, grouped by project, newest first, limited to `fields`."""
+    grouped = {project_id: [] for project_id in project_ids}
+    if not project_ids:
+        return grouped
+    ids = bindparam("ids", list(project_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
     result = await db.execute(
-        select(Project)
-        .options(selectinload(Project.tasks))
-        .order_by(desc(Project.last_accessed))
-        .offset(skip)
-        .limit(limit)
+        select(*select_fields(TASK_COLUMNS, fields, ("project_id",)))
+        .where(Task.project_id == any_(ids))
+        .order_by(desc(Task.updated_at), desc(Task.id))
     )
-    return result.scalars().all()
+    keep_project_id = fields is None or "project_id" in fields
+    for task in rows_to_dicts(result):
+        grouped[task["project_id"] if keep_project_id else task.pop("project_id")].append(task)
+    return grouped
 
-async def get_project(db: AsyncSession, project_id: UUID) -> Project:
+async def get_projects(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None, fields: Optional[Fields] = None
+) -> List[dict]:
+    """Projects with their tasks as plain dicts; `id` and `last_accessed` are kept for the page cursor.
+
+    `fields` names project columns, `tasks` for whole tasks or `tasks.<field>` for some of
+    their columns; tasks are not queried at all unless asked for.
+    """
     result = await db.execute(
-        select(Project)
-        .options(selectinload(Project.tasks))
-        .filter(Project.id == project_id)
+        _page(select(*select_fields(PROJECT_COLUMNS, fields, ("id",)), Project.last_accessed), skip, limit, cursor)
     )
-    return result.scalar_one_or_none()
+    projects = rows_to_dicts(result)
+    task_fields = nested_fields(fields, "tasks")
+    if task_fields == ():
+        return projects
+    tasks = await _tasks_by_project(db, [project["id"] for project in projects], task_fields)
+    for project in projects:
+        project["tasks"] = tasks[project["id"]]
+    return projects
 
-async def touch_project(db: AsyncSession, project_id: UUID):
-    await db.execute(
-        update(Project)
+async def get_project_summaries(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None, fields: Optional[Fields] = None
+) -> List[dict]:
+    """Projects with task counts from one GROUP BY query, as plain dicts (no ORM objects).
+
+    The page of projects is chosen first, so only its tasks are counted. The tasks
+    join is skipped when `fields` asks for no counts.
+    """
+    counts = [
+        count for count in (
+            func.count(Task.id).label("task_count"),
+            func.count(Task.id).filter(Task.completed.is_(True)).label("completed_count"),
+        )
+        if fields is None or count.key in fields
+    ]
+    query = select(*select_fields(PROJECT_COLUMNS, fields, ("id",)), *counts, Project.last_accessed)
+    if not counts:
+        result = await db.execute(_page(query, skip, limit, cursor))
+        return rows_to_dicts(result)
+    page = _page(select(Project.id), skip, limit, cursor).scalar_subquery()
+    result = await db.execute(
+        query.where(Project.id.in_(page))
+        .outerjoin(Task, Task.project_id == Project.id)
+        .group_by(Project.id)
+        .order_by(desc(Project.last_accessed), desc(Project.id))
+    )
+    return rows_to_dicts(result)
+
+async def get_project_detail(db: AsyncSession, project_id: UUID) -> Optional[dict]:
+    """One project with its tasks as a plain dict, or None if missing."""
+    result = await db.execute(select(*PROJECT_COLUMNS).where(Project.id == project_id))
+    row = result.one_or_none()
+    if row is None:
+        return None
+    project = row._asdict()
+    project["tasks"] = (await _tasks_by_project(db, [project_id]))[project_id]
+    return project
+
+def _with_ratios(stats: dict) -> dict:
+    stats["open_count"] = stats["task_count"] - stats["completed_count"]
+    stats["completion"] = round(stats["completed_count"] / stats["task_count"], 4) if stats["task_count"] else 0.0
+    return stats
+
+async def get_project_stats(db: AsyncSession, project_id: UUID) -> Optional[dict]:
+    """Counters for one project from project_stats (a single-row lookup), or None if it does not exist."""
+    result = await db.execute(
+        select(
+            Project.id.label("project_id"),
+            func.coalesce(ProjectStats.task_count, 0).label("task_count"),
+            func.coalesce(ProjectStats.completed_count, 0).label("completed_count"),
+            ProjectStats.last_activity_at,
+        )
+        .outerjoin(ProjectStats, ProjectStats.project_id == Project.id)
         .where(Project.id == project_id)
-        .values(last_accessed=func.now())
     )
+    row = result.one_or_none()
+    return _with_ratios(row._asdict()) if row is not None else None
+
+async def get_fleet_stats(db: AsyncSession) -> dict:
+    """Totals over all projects: sums the per-project counters, never scans tasks."""
+    result = await db.execute(
+        select(
+            select(func.count()).select_from(Project).scalar_subquery().label("project_count"),
+            func.coalesce(func.sum(ProjectStats.task_count), 0).label("task_count"),
+            func.coalesce(func.sum(ProjectStats.completed_count), 0).label("completed_count"),
+            func.max(ProjectStats.last_activity_at).label("last_activity_at"),
+        )
+    )
+    return _with_ratios(result.one()._asdict())
+
+async def reconcile_project_stats(db: AsyncSession) -> int:
+    """Recount every project's counters from tasks and fix rows that drifted; returns how many changed.
+
+    Locks tasks against writes for the duration so the recount cannot race the triggers.
+    """
+    await db.execute(text("LOCK TABLE tasks IN SHARE MODE"))
+    actual = (
+        select(
+            Project.id,
+            func.count(Task.id),
+            func.count(Task.id).filter(Task.completed.is_(True)),
+            func.max(Task.updated_at),
+        )
+        .outerjoin(Task, Task.project_id == Project.id)
+        .group_by(Project.id)
+    )
+    stmt = pg_insert(ProjectStats).from_select(
+        ["project_id", "task_count", "completed_count", "last_activity_at"], actual
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProjectStats.project_id],
+        set_={
+            "task_count": stmt.excluded.task_count,
+            "completed_count": stmt.excluded.completed_count,
+            "last_activity_at": func.greatest(ProjectStats.last_activity_at, stmt.excluded.last_activity_at),
+        },
+        where=(ProjectStats.task_count != stmt.excluded.task_count)
+        | (ProjectStats.completed_count != stmt.excluded.completed_count),
+    ).returning(ProjectStats.project_id)
+    repaired = len((await db.execute(stmt)).all())
     await db.commit()
+    return repaired
 
-async def create_project(db: AsyncSession, project: ProjectCreate):
-    db_project = Project(**project.model_dump())
-    db.add(db_project)
+async def touch_projects(db: AsyncSession, project_ids: Iterable[UUID]):
+    ids = bindparam("ids", list(project_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    await db.execute(
+        update(Project)
+        .where(Project.id == any_(ids))
+        # Access is not a modification: keep updated_at (and so ETags) unchanged
+        .values(last_accessed=func.now(), updated_at=Project.updated_at)
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
+
+async def project_fingerprint(db: AsyncSession, project_id: UUID):
+    """(updated_at, newest task updated_at, task count) for one project, or None if missing."""
+    tasks = select(Task).where(Task.project_id == Project.id)
+    result = await db.execute(
+        select(
+            Project.updated_at,
+            tasks.with_only_columns(func.max(Task.updated_at)).scalar_subquery(),
+            tasks.with_only_columns(func.count()).scalar_subquery(),
+        ).where(Project.id == project_id)
+    )
+    return result.one_or_none()
+
+async def projects_fingerprint(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None):
+    """What one page of the project list depends on, read without touching other projects.
+
+    The page's (id, last_accessed, updated_at) rows in list order, so a reordering
+    changes it, each followed by the newest task updated_at and task count of the
+    page's projects (the same for every row; computed once).
+    """
+    page = _page(select(Project.id, Project.last_accessed, Project.updated_at), skip, limit, cursor).cte("page")
+    tasks = select(Task).where(Task.project_id.in_(select(page.c.id)))
     result = await db.execute(
-        select(Project).options(selectinload(Project.tasks)).where(Project.id == db_project.id)
+        select(
+            page,
+            tasks.with_only_columns(func.max(Task.updated_at)).scalar_subquery(),
+            tasks.with_only_columns(func.count()).scalar_subquery(),
+        ).order_by(desc(page.c.last_accessed), desc(page.c.id))
     )
-    return result.scalar_one()
+    return tuple(result.all())
+
+async def create_project(db: AsyncSession, project: ProjectCreate):
+    db_project = await db.scalar(insert(Project).values(**project.model_dump()).returning(Project))
+    await notify_change(db, "project", "create", [(db_project.id, [db_project.id])])
+    await db.commit()
+    # A new project has no tasks; mark the collection loaded so nothing lazy-loads it
+    set_committed_value(db_project, "tasks", [])
+    return db_project
 
 async def update_project(db: AsyncSession, project_id: UUID, project: ProjectUpdate):
     update_data = project.model_dump(exclude_unset=True)
-    await db.execute(
+    db_project = await db.scalar(
         update(Project)
         .where(Project.id == project_id)
         .values(**update_data, last_accessed=func.now())
+        .returning(Project)
+        .execution_options(synchronize_session=False, populate_existing=True)
     )
+    if db_project is None:
+        await db.rollback()
+        return None
+    tasks = await db.scalars(select(Task).where(Task.project_id == project_id))
+    await notify_change(db, "project", "update", [(project_id, [project_id])])
+    await db.commit()
+    set_committed_value(db_project, "tasks", tasks.all())
+    await invalidate(project_key(project_id))
+    return db_project
+
+async def delete_project(db: AsyncSession, project_id: UUID) -> bool:
+    """One DELETE; the FK cascade removes the tasks and the triggers record them."""
+    deleted = await db.scalar(delete(Project).where(Project.id == project_id).returning(Project.id))
+    if deleted is None:
+        await db.rollback()
+        return False
+    await notify_change(db, "project", "delete", [(project_id, [project_id])])
     await db.commit()
-    return await get_project(db, project_id)
+    # Cached task details need no invalidation: reads check the row exists first
+    await invalidate(project_key(project_id), project_tasks_key(project_id))
+    return True
+
+async def delete_project_chunked(
+    db: AsyncSession,
+    project_id: UUID,
+    chunk_size: int = PROJECT_DELETE_CHUNK_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Delete a project's tasks chunk_size at a time, committing each chunk, then the project.
 
-async def delete_project(db: AsyncSession, project_id: UUID):
-    db_project = await get_project(db, project_id)
-    if db_project:
-        await db.delete(db_project)
+    Keeps each transaction (and its locks and trigger work) small for very large
+    projects. Returns the number of tasks deleted.
+    """
+    chunk = select(Task.id).where(Task.project_id == project_id).limit(chunk_size)
+    total = 0
+    while True:
+        result = await db.execute(
+            delete(Task).where(Task.id.in_(chunk.scalar_subquery())).returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        task_ids = result.scalars().all()
+        if task_ids:
+            await notify_change(db, "task", "delete", [(task_id, [project_id]) for task_id in task_ids])
         await db.commit()
-        return True
-    return False 
\ No newline at end of file
+        await invalidate(project_tasks_key(project_id), *(task_key(task_id) for task_id in task_ids))
+        total += len(task_ids)
+        if progress:
+            progress(len(task_ids))
+        if len(task_ids) < chunk_size:
+            break
+    await delete_project(db, project_id)
+    return total
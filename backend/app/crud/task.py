@@ -1,47 +1,261 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, tuple_, insert, update, delete, values, column, cast, any_, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from uuid import UUID
+from ..models.project import Project
 from ..models.task import Task
-from ..schemas.task import TaskCreate, TaskUpdate
+from ..schemas.task import TaskCreate, TaskUpdate, TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete, TaskBatchResult
+from ..utils.pagination import Cursor
+from ..utils.cache import invalidate, task_key, project_key, project_tasks_key
+from ..utils.events import notify_change
+from ..utils.serialization import rows_to_dicts
+from ..utils.projection import Fields, select_fields
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+class ProjectNotFound(Exception):
+    """A write referenced projects that do not exist; nothing was written."""
+
+    def __init__(self, project_ids: List[UUID]):
+        self.project_ids = project_ids
+        super().__init__(f"Project not found: {', '.join(map(str, project_ids))}")
+
+# Read-path columns, in schemas.task.Task field order so rows serialize straight to JSON
+TASK_COLUMNS = (
+    Task.title, Task.description, Task.completed, Task.project_id,
+    Task.id, Task.created_at, Task.updated_at,
+)
+TASK_FIELDS = tuple(column.key for column in TASK_COLUMNS)
+# Selected whatever the `fields=` projection, since the page cursor is built from them
+TASK_PAGE_FIELDS = ("updated_at", "id")
+
+async def _invalidate_tasks(*pairs):
+    """Drop cached responses for (task_id, project_id) pairs and the projects embedding them."""
+    names = []
+    for task_id, project_id in pairs:
+        names.append(task_key(task_id))
+        if project_id is not None:
+            names += [project_key(project_id), project_tasks_key(project_id)]
+    await invalidate(*names)
+
+async def _project_ids(db: AsyncSession, task_ids: List[UUID]) -> List[tuple]:
+    """Current (id, project_id) of tasks, read before a move so the old project is invalidated too."""
+    ids = bindparam("ids", list(task_ids), type_=ARRAY(Task.__table__.c.id.type))
+    result = await db.execute(select(Task.id, Task.project_id).where(Task.id == any_(ids)))
+    return result.all()
+
+async def task_fingerprint(db: AsyncSession, task_id: UUID):
+    return await db.scalar(select(Task.updated_at).where(Task.id == task_id))
 
 async def get_task(db: AsyncSession, task_id: UUID) -> Optional[Task]:
     result = await db.execute(select(Task).where(Task.id == task_id))
     return result.scalars().first()
 
-async def get_tasks(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Task]:
+async def get_task_detail(db: AsyncSession, task_id: UUID) -> Optional[dict]:
+    """One task as a plain dict for the read path, or None if missing."""
+    result = await db.execute(select(*TASK_COLUMNS).where(Task.id == task_id))
+    row = result.one_or_none()
+    return row._asdict() if row is not None else None
+
+def _page(query, skip: int, limit: int, cursor: Optional[Cursor]):
+    """Order newest first; seek past the cursor when given, otherwise fall back to offset."""
+    query = query.order_by(desc(Task.updated_at), desc(Task.id)).limit(limit)
+    if cursor is not None:
+        return query.where(tuple_(Task.updated_at, Task.id) < tuple_(*cursor))
+    return query.offset(skip)
+
+async def tasks_fingerprint(db: AsyncSession, project_id: Optional[UUID] = None):
+    """(newest updated_at, count) of a project's tasks, or of standalone tasks when project_id is None."""
     result = await db.execute(
-        select(Task).where(Task.project_id == None).order_by(desc(Task.updated_at)).offset(skip).limit(limit)
+        select(func.max(Task.updated_at), func.count()).where(Task.project_id == project_id)
     )
-    return result.scalars().all()
+    return result.one()
 
-async def get_tasks_by_project(db: AsyncSession, project_id: UUID, skip: int = 0, limit: int = 100) -> List[Task]:
+async def get_tasks(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None, fields: Optional[Fields] = None
+) -> List[dict]:
+    """Standalone tasks as plain dicts (no ORM objects, no per-row validation), limited to `fields`."""
+    columns = select_fields(TASK_COLUMNS, fields, TASK_PAGE_FIELDS)
     result = await db.execute(
-        select(Task).where(Task.project_id == project_id).order_by(desc(Task.updated_at)).offset(skip).limit(limit)
+        _page(select(*columns).where(Task.project_id == None), skip, limit, cursor)
     )
-    return result.scalars().all()
+    return rows_to_dicts(result)
 
-async def create_task(db: AsyncSession, task: TaskCreate) -> Task:
-    db_task = Task(**task.model_dump())
-    db.add(db_task)
-    await db.commit()
-    await db.refresh(db_task)
+async def get_tasks_by_project(db: AsyncSession, project_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None) -> List[dict]:
+    result = await db.execute(
+        _page(select(*TASK_COLUMNS).where(Task.project_id == project_id), skip, limit, cursor)
+    )
+    return rows_to_dicts(result)
+
+async def search_tasks(
+    db: AsyncSession,
+    q: str,
+    project_id: Optional[UUID] = None,
+    completed: Optional[bool] = None,
+    limit: int = 50,
+    cursor: Optional[Cursor] = None,
+):
+    """Tasks matching a web-style query (GIN index), best rank first, as dicts with a `rank` key."""
+    query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank_cd(Task.search_vector, query).label("rank")
+    stmt = select(*TASK_COLUMNS, rank).where(Task.search_vector.op("@@")(query))
+    if project_id is not None:
+        stmt = stmt.where(Task.project_id == project_id)
+    if completed is not None:
+        stmt = stmt.where(Task.completed.is_(completed))
+    if cursor is not None:
+        stmt = stmt.where(tuple_(rank, Task.id) < tuple_(*cursor))
+    result = await db.execute(stmt.order_by(desc(rank), desc(Task.id)).limit(limit))
+    return rows_to_dicts(result)
+
+async def create_task(db: AsyncSession, task: TaskCreate) -> Optional[Task]:
+    """Insert and return the row in one statement; None if project_id does not exist."""
+    try:
+        db_task = await db.scalar(insert(Task).values(**task.model_dump()).returning(Task))
+        await notify_change(db, "task", "create", [(db_task.id, [db_task.project_id])])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if getattr(e.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+            return None
+        raise
+    await _invalidate_tasks((db_task.id, db_task.project_id))
     return db_task
 
 async def update_task(db: AsyncSession, task_id: UUID, task: TaskUpdate) -> Optional[Task]:
-    db_task = await get_task(db, task_id)
-    if db_task:
-        update_data = task.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_task, field, value)
-        await db.commit()
-        await db.refresh(db_task)
+    """Update and return the row, or None if it does not exist; ProjectNotFound if moved to a missing project."""
+    update_data = task.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_task(db, task_id)
+    moved_from = await _project_ids(db, [task_id]) if "project_id" in update_data else []
+    try:
+        db_task = await db.scalar(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**update_data)
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        if getattr(e.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+            raise ProjectNotFound([update_data["project_id"]]) from e
+        raise
+    if db_task is not None:
+        await notify_change(
+            db, "task", "update", [(task_id, [db_task.project_id, *(p for _, p in moved_from)])]
+        )
+    await db.commit()
+    if db_task is not None:
+        await _invalidate_tasks((db_task.id, db_task.project_id), *moved_from)
     return db_task
 
 async def delete_task(db: AsyncSession, task_id: UUID) -> bool:
-    db_task = await get_task(db, task_id)
-    if db_task:
-        await db.delete(db_task)
-        await db.commit()
-        return True
-    return False 
\ No newline at end of file
+    result = await db.execute(delete(Task).where(Task.id == task_id).returning(Task.id, Task.project_id))
+    deleted = result.one_or_none()
+    if deleted is None:
+        await db.rollback()
+        return False
+    await notify_change(db, "task", "delete", [(deleted.id, [deleted.project_id])])
+    await db.commit()
+    await _invalidate_tasks(deleted)
+    return True
+
+async def _batch_create(db: AsyncSession, ops: List[TaskBatchCreate]) -> List[Task]:
+    """One multi-row INSERT ... RETURNING; rows come back in parameter order."""
+    rows = [op.model_dump(exclude={"op"}) for op in ops]
+    result = await db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True), rows
+    )
+    return result.all()
+
+async def _batch_update(db: AsyncSession, ops: List[TaskBatchUpdate]) -> List[Task]:
+    """UPDATE ... FROM (VALUES ...) ... RETURNING, one statement per distinct set of fields."""
+    groups = {}
+    for op in ops:
+        changes = op.model_dump(exclude_unset=True, exclude={"op"})
+        groups.setdefault(tuple(sorted(changes)), []).append(changes)
+    updated = []
+    for fields, rows in groups.items():
+        columns = [Task.__table__.c[name] for name in fields]
+        # Typed casts keep asyncpg from guessing text for NULLs and booleans
+        batch = values(*[column(col.name, col.type) for col in columns], name="batch").data(
+            [tuple(cast(row[col.name], col.type) for col in columns) for row in rows]
+        )
+        stmt = (
+            update(Task)
+            .where(Task.id == batch.c.id)
+            .values({**{name: batch.c[name] for name in fields if name != "id"}, "updated_at": func.now()})
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        updated.extend((await db.scalars(stmt)).all())
+    return updated
+
+async def _batch_delete(db: AsyncSession, ops: List[TaskBatchDelete]) -> List[tuple]:
+    ids = bindparam("ids", [op.id for op in ops], type_=ARRAY(Task.__table__.c.id.type))
+    result = await db.execute(delete(Task).where(Task.id == any_(ids)).returning(Task.id, Task.project_id))
+    return result.all()
+
+async def _missing_projects(db: AsyncSession, ops) -> List[UUID]:
+    requested = {op.project_id for op in ops if op.project_id is not None}
+    ids = bindparam("ids", list(requested), type_=ARRAY(Task.__table__.c.id.type))
+    existing = await db.scalars(select(Project.id).where(Project.id == any_(ids)))
+    return sorted(requested - set(existing), key=str)
+
+async def apply_task_batch(db: AsyncSession, operations) -> List[TaskBatchResult]:
+    """Apply creates, then updates, then deletes in one transaction with set-based statements.
+
+    Results are returned in the order the operations were given.
+    """
+    creates = [op for op in operations if op.op == "create"]
+    updates = [op for op in operations if op.op == "update"]
+    deletes = [op for op in operations if op.op == "delete"]
+    moves = [op.id for op in updates if "project_id" in op.model_fields_set]
+    moved_from = await _project_ids(db, moves) if moves else []
+    try:
+        created = await _batch_create(db, creates) if creates else []
+        updated = {task.id: task for task in await _batch_update(db, updates)} if updates else {}
+    except IntegrityError as e:
+        await db.rollback()
+        if getattr(e.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+            raise ProjectNotFound(await _missing_projects(db, [*creates, *updates])) from e
+        raise
+    removed = await _batch_delete(db, deletes) if deletes else []
+    if created:
+        await notify_change(db, "task", "create", [(t.id, [t.project_id]) for t in created])
+    if updated:
+        previous = dict(moved_from)
+        await notify_change(
+            db, "task", "update", [(t.id, [t.project_id, previous.get(t.id)]) for t in updated.values()]
+        )
+    if removed:
+        await notify_change(db, "task", "delete", [(i, [p]) for i, p in removed])
+    await db.commit()
+    await _invalidate_tasks(
+        *((task.id, task.project_id) for task in [*created, *updated.values()]),
+        *moved_from,
+        *removed,
+    )
+    deleted = {task_id for task_id, _ in removed}
+
+    created_iter = iter(created)
+    results = []
+    for op in operations:
+        if op.op == "create":
+            task = next(created_iter)
+            results.append(TaskBatchResult(op=op.op, id=task.id, ok=True, task=task))
+        elif op.op == "update":
+            task = updated.get(op.id)
+            results.append(TaskBatchResult(
+                op=op.op, id=op.id, ok=task is not None, task=task,
+                detail=None if task else "Task not found",
+            ))
+        else:
+            found = op.id in deleted
+            results.append(TaskBatchResult(
+                op=op.op, id=op.id, ok=found, detail=None if found else "Task not found",
+            ))
+    return results
@@ -1,29 +1,194 @@
+import json
 import os
+import threading
+import time
+from uuid import uuid4
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from dotenv import load_dotenv
 
 # Load environment variables from .env
 load_dotenv()
 
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("true", "1", "yes")
+
 DB_USER = os.getenv("DB_USER", "taskuser")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "taskpass")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "taskdb")
+# Optional read replica; GET endpoints use it when set
+DB_READ_HOST = os.getenv("DB_READ_HOST")
+DB_READ_PORT = os.getenv("DB_READ_PORT", DB_PORT)
+
+DB_ECHO = _env_bool("DB_ECHO", "false")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "true")
+# Separate, small pool for admin export/import/delete jobs so they never take
+# connections from request traffic. An incremental export holds four at once (the
+# snapshot coordinator, projects, tasks and tombstones), and up to
+# JOBS_MAX_CONCURRENCY jobs run together; one more serves /api/admin/export/{table}.
+# JOBS_MAX_CONCURRENCY is read here too because utils.jobs imports this module.
+DB_ADMIN_POOL_SIZE = int(os.getenv(
+    "DB_ADMIN_POOL_SIZE", str(4 * int(os.getenv("JOBS_MAX_CONCURRENCY", "1")) + 1)
+))
+# Connections opened (and read statements prepared on) per pool at startup; 0 disables
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", str(DB_POOL_SIZE)))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+# PgBouncer in transaction mode: no prepared statement caching, no startup parameters,
+# and let PgBouncer do the pooling
+DB_PGBOUNCER = _env_bool("DB_PGBOUNCER", "false")
 
 DATABASE_URL = (
     f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
+READ_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_READ_HOST}:{DB_READ_PORT}/{DB_NAME}"
+    if DB_READ_HOST else None
+)
+
+class PoolMetrics:
+    """Counts pool checkouts and how long callers waited for a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self.timeouts += timed_out
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "timeouts": self.timeouts,
+            }
+
+# Called with each checkout's wait in seconds (e.g. to attribute it to the current request)
+pool_wait_listeners = []
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait (including new-connection time) in `metrics`."""
+
+    metrics = PoolMetrics()
+
+    def _record(self, waited: float, timed_out: bool = False):
+        self.metrics.record(waited, timed_out)
+        for listener in pool_wait_listeners:
+            listener(waited)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self._record(time.perf_counter() - started, timed_out=True)
+            raise
+        self._record(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        # Keep metrics across pool recreation (e.g. after engine.dispose())
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+def create_engine(url: str, metrics: PoolMetrics, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    cache_size = 0 if DB_PGBOUNCER else DB_STATEMENT_CACHE_SIZE
+    connect_args = {
+        # SQLAlchemy's own prepared statement cache, and asyncpg's for driver-level queries
+        "prepared_statement_cache_size": cache_size,
+        "statement_cache_size": cache_size,
+    }
+    if DB_PGBOUNCER:
+        # Unique names so prepared statements never collide across pooled server connections
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    pool_args = (
+        {"poolclass": NullPool}
+        if DB_PGBOUNCER
+        else {
+            "poolclass": TimedQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+        }
+    )
+    async_engine = create_async_engine(
+        url,
+        echo=DB_ECHO,
+        connect_args=connect_args,
+        # SQLAlchemy's asyncpg dialect installs json/jsonb codecs with these
+        json_serializer=lambda value: json.dumps(value, separators=(",", ":")),
+        json_deserializer=json.loads,
+        **pool_args,
+    )
+    async_engine.pool.metrics = metrics
+    return async_engine
+
+pool_metrics = PoolMetrics()
+engine = create_engine(DATABASE_URL, pool_metrics)
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+read_pool_metrics = PoolMetrics()
+read_engine = create_engine(READ_DATABASE_URL, read_pool_metrics) if READ_DATABASE_URL else engine
+# One snapshot per read request: the fingerprint behind an ETag and the body
+# served with it come from the same state of the database. asyncpg applies the
+# level in the BEGIN it already sends, so this costs no extra round trip.
+AsyncReadSessionLocal = sessionmaker(
+    bind=read_engine.execution_options(isolation_level="REPEATABLE READ"), class_=AsyncSession, expire_on_commit=False
+)
+
+admin_pool_metrics = PoolMetrics()
+admin_engine = create_engine(DATABASE_URL, admin_pool_metrics, pool_size=DB_ADMIN_POOL_SIZE, max_overflow=0)
+AdminSessionLocal = sessionmaker(
+    bind=admin_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 # Dependency for FastAPI
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session 
\ No newline at end of file
+        yield session
+
+# Dependency for read-only endpoints; uses the replica when DB_READ_HOST is set
+async def get_read_db():
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+async def dispose_engines():
+    """Close every pooled connection; call last on shutdown."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    await admin_engine.dispose()
+
+def pool_stats() -> dict:
+    stats = {"primary": {**pool_metrics.snapshot(), "status": engine.pool.status()}}
+    if read_engine is not engine:
+        stats["replica"] = {**read_pool_metrics.snapshot(), "status": read_engine.pool.status()}
+    stats["admin"] = {**admin_pool_metrics.snapshot(), "status": admin_engine.pool.status()}
+    return stats
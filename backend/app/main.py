@@ -1,8 +1,51 @@
+import time
+# Cold start is measured from here: app imports, then lifespan startup
+IMPORT_STARTED = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from .api.api import api_router
+from .database import engine, read_engine, admin_engine, pool_wait_listeners, dispose_engines
+from .utils import profiling
+from .utils.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from .utils.pagination import NEXT_CURSOR_HEADER
+from .utils.touches import touch_aggregator
+from .utils.events import change_feed
+from .utils.cache import CACHE_ENABLED, apply_change, response_cache
+from .utils.jobs import JOBS_SHUTDOWN_TIMEOUT, job_runner
+from .utils.warmup import warm_pools
+
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Tasks API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_started = time.perf_counter()
+    touch_aggregator.start()
+    change_feed.start()
+    job_runner.start()
+    await warm_pools()
+    ready = time.perf_counter()
+    timings = {
+        "imports": startup_started - IMPORT_STARTED,
+        "lifespan": ready - startup_started,
+        "total": ready - IMPORT_STARTED,
+    }
+    for phase, seconds in timings.items():
+        profiling.startup_seconds.set(round(seconds, 6), phase)
+    logger.info("Worker ready in %.3fs (imports %.3fs, startup and pool warmup %.3fs)",
+                timings["total"], timings["imports"], timings["lifespan"])
+    yield
+    # The server has already stopped accepting and drained in-flight requests
+    await job_runner.stop(JOBS_SHUTDOWN_TIMEOUT)
+    await change_feed.stop()
+    # Flush pending last_accessed touches before the process exits
+    await touch_aggregator.stop()
+    await dispose_engines()
+
+app = FastAPI(title="Tasks API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -11,6 +54,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
 )
 
+if CACHE_ENABLED and not response_cache.shared:
+    # Each worker has its own cache; apply every worker's writes to it
+    change_feed.listeners.append(apply_change)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+if profiling.PROFILING_ENABLED:
+    profiling.install(engine, read_engine, admin_engine)
+    pool_wait_listeners.append(profiling.record_pool_wait)
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Per worker process; only startup timings unless PROFILING_ENABLED is set
+    return PlainTextResponse(profiling.render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.include_router(api_router, prefix="/api") 
\ No newline at end of file
@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..database import Base
+
+class AdminJob(Base):
+    """Status of an admin job, shared by all workers.
+
+    The worker running a job writes it on every state change and periodically
+    while it is queued or running (see utils.jobs.JobRunner); `updated_at` is
+    that heartbeat.
+    """
+
+    __tablename__ = "admin_jobs"
+
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    rows = Column(BigInteger, nullable=False, default=0)
+    bytes = Column(BigInteger, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_admin_jobs_created_at", created_at.desc()),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -12,8 +12,15 @@ class Project(Base):
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     last_accessed = Column(DateTime(timezone=True), server_default=func.now())
     
-    # Use string reference to avoid circular imports
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan") 
\ No newline at end of file
+    # Use string reference to avoid circular imports. The FK cascades deletes in the
+    # database, so the ORM does not load tasks just to delete them.
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Keyset pagination: most recently accessed first
+    __table_args__ = (
+        Index("ix_projects_last_accessed_id", last_accessed.desc(), id.desc()),
+    )
+ 
\ No newline at end of file
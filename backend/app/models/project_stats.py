@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from ..database import Base
+
+class ProjectStats(Base):
+    """Per-project task counters, kept current by statement-level triggers on tasks.
+
+    Every write path (CRUD, batch, COPY import, cascades) goes through the
+    triggers; `reconcile_project_stats` repairs any drift.
+    """
+
+    __tablename__ = "project_stats"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    task_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    # Last time a task of the project was created, changed or deleted
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
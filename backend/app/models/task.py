@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Boolean, DateTime, ForeignKey, String
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Boolean, Computed, DateTime, ForeignKey, Index, String
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import func
 from uuid import uuid4
 from ..database import Base
 
+# Title matches rank above description matches
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
 class Task(Base):
     __tablename__ = "tasks"
 
@@ -13,11 +19,20 @@ class Task(Base):
     description = Column(String, nullable=True)
     completed = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Project relationship
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
     project = relationship("Project", back_populates="tasks")
 
+    # Full-text search; maintained by Postgres on every insert/update, never loaded by default
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+
+    __table_args__ = (
+        # Keyset pagination: newest-first range scans per project (NULL = standalone tasks)
+        Index("ix_tasks_project_id_updated_at_id", project_id, updated_at.desc(), id.desc()),
+        Index("ix_tasks_search_vector", search_vector, postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title})>" 
\ No newline at end of file
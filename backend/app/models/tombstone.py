@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from ..database import Base
+
+class Tombstone(Base):
+    """A deleted project or task, written by a statement-level trigger on its table (see the add_tombstones migration)."""
+
+    __tablename__ = "tombstones"
+
+    table_name = Column(String, primary_key=True)
+    row_id = Column(UUID(as_uuid=True), primary_key=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_tombstones_deleted_at", deleted_at),
+    )
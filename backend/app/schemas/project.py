@@ -20,4 +20,30 @@ class Project(ProjectBase):
     tasks: List[Task] = []
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class ProjectSummary(ProjectBase):
+    id: UUID4
+    created_at: datetime
+    updated_at: datetime
+    task_count: int
+    completed_count: int
+
+    class Config:
+        from_attributes = True
+
+class ProjectStats(BaseModel):
+    project_id: UUID4
+    task_count: int
+    completed_count: int
+    open_count: int
+    completion: float
+    last_activity_at: Optional[datetime] = None
+
+class FleetStats(BaseModel):
+    project_count: int
+    task_count: int
+    completed_count: int
+    open_count: int
+    completion: float
+    last_activity_at: Optional[datetime] = None
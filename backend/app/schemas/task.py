@@ -1,6 +1,7 @@
-from pydantic import BaseModel, UUID4
+from collections import Counter
+from pydantic import BaseModel, Field, UUID4, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, List, Literal, Optional, Union
 
 class TaskBase(BaseModel):
     title: str
@@ -20,4 +21,42 @@ class Task(TaskBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class TaskSearchResult(Task):
+    rank: float
+
+class TaskBatchCreate(TaskCreate):
+    op: Literal["create"]
+
+class TaskBatchUpdate(TaskUpdate):
+    op: Literal["update"]
+    id: UUID4
+
+class TaskBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: UUID4
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete], Field(discriminator="op")
+]
+
+class TaskBatch(BaseModel):
+    operations: List[TaskBatchOperation] = Field(max_length=1000)
+
+    @model_validator(mode="after")
+    def unique_ids(self):
+        # UPDATE ... FROM (VALUES ...) would pick one of the duplicates arbitrarily, and an
+        # update and a delete of the same task in one transaction contradict each other
+        counts = Counter(op.id for op in self.operations if op.op in ("update", "delete"))
+        duplicates = sorted(str(task_id) for task_id, count in counts.items() if count > 1)
+        if duplicates:
+            raise ValueError(f"Task ids used by more than one update/delete operation: {', '.join(duplicates)}")
+        return self
+
+class TaskBatchResult(BaseModel):
+    op: str
+    id: Optional[UUID4] = None
+    ok: bool
+    task: Optional[Task] = None
+    detail: Optional[str] = None
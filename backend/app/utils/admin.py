@@ -1,37 +1,381 @@
+import asyncio
 import csv
+import io
+import json
+import logging
 import os
-from datetime import timezone, datetime
+import time
+import zlib
+from datetime import timezone, datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 import uuid
+from sqlalchemy import and_, any_, bindparam, delete, exists, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from ..database import AdminSessionLocal
+from ..models.tombstone import Tombstone
+from .parquet import ParquetFileWriter, open_parquet, parquet_position, read_parquet_batch
+
+logger = logging.getLogger(__name__)
 
 EXPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../exports'))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+# Incremental exports pick up rows with updated_at after this; it sits next to the exports
+WATERMARK_FILE = os.path.join(EXPORTS_DIR, "watermark.json")
+# updated_at is the writer's transaction start, so a transaction that commits after the
+# export snapshot can carry an earlier timestamp. Re-exporting this overlap is harmless
+# because delta imports upsert.
+WATERMARK_OVERLAP = float(os.getenv("EXPORT_WATERMARK_OVERLAP", "60"))
 
-async def export_model_to_csv(db, model, timestamp):
-    table = model.__table__
-    result = await db.execute(table.select())
-    rows = result.fetchall()
-    fields = [col.name for col in table.columns]
-    filename = f"{table.name}_{timestamp}.csv"
-    os.makedirs(EXPORTS_DIR, exist_ok=True)
+def data_columns(model):
+    """Columns that hold data; generated columns are derived by Postgres and never exported or imported."""
+    return [col for col in model.__table__.columns if col.computed is None]
+
+def model_query(model, since=None):
+    """Data columns of the model's table, optionally only rows changed after `since`."""
+    query = select(*data_columns(model))
+    if since is not None:
+        query = query.where(model.updated_at > since)
+    return query
+
+def tombstones_query(models, since):
+    """Deletions after `since`, minus rows that exist again (re-created or re-imported)."""
+    alive = or_(*(
+        and_(Tombstone.table_name == model.__tablename__, exists().where(model.id == Tombstone.row_id))
+        for model in models
+    ))
+    return (
+        select(Tombstone.table_name, Tombstone.row_id, Tombstone.deleted_at)
+        .where(Tombstone.deleted_at > since, ~alive)
+    )
+
+async def iter_query_batches(db, query, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield the query's rows in fixed-size batches from a server-side cursor."""
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for rows in result.partitions(batch_size):
+        yield rows
+
+def iter_model_batches(db, model, batch_size: int = EXPORT_BATCH_SIZE):
+    return iter_query_batches(db, model_query(model), batch_size)
+
+def encode_csv(rows, header=None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+class CsvFileWriter:
+    """Writes DB row batches to a CSV file with a header row. Not async; call from a thread."""
+
+    def __init__(self, path: str, columns):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._file.write(encode_csv([], header=[col.name for col in columns]))
+
+    def write(self, rows) -> int:
+        chunk = encode_csv(rows)
+        self._file.write(chunk)
+        return len(chunk)
+
+    def close(self):
+        self._file.close()
+
+def is_parquet(filename: str) -> bool:
+    return filename.lower().endswith(".parquet")
+
+async def export_query_to_file(db, query, filename, progress=None):
+    """Write the query's rows to EXPORTS_DIR/filename as CSV, or Parquet for a .parquet name."""
+    writer_class = ParquetFileWriter if is_parquet(filename) else CsvFileWriter
+    await asyncio.to_thread(os.makedirs, EXPORTS_DIR, exist_ok=True)
     path = os.path.join(EXPORTS_DIR, filename)
-    with open(path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(fields)
-        for row in rows:
-            writer.writerow([getattr(row, field) for field in fields])
+    # File IO and encoding run in a worker thread so the event loop keeps serving requests
+    writer = await asyncio.to_thread(writer_class, path, query.selected_columns)
+    try:
+        async for rows in iter_query_batches(db, query):
+            written = await asyncio.to_thread(writer.write, rows)
+            if progress:
+                progress(rows=len(rows), bytes=written)
+    finally:
+        await asyncio.to_thread(writer.close)
     return filename
 
-def parse_row(model, row):
-    parsed = {}
-    for col in model.__table__.columns:
-        val = row.get(col.name)
+async def export_model_to_file(db, model, timestamp, since=None, progress=None, format="csv"):
+    suffix = "_delta" if since is not None else ""
+    filename = f"{model.__tablename__}{suffix}_{timestamp}.{format}"
+    return await export_query_to_file(db, model_query(model, since), filename, progress)
+
+async def _set_snapshot(db, snapshot_id: str):
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    # SET TRANSACTION SNAPSHOT takes no bind parameters; the id comes from pg_export_snapshot()
+    await db.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+
+async def _export_in_snapshot(snapshot_id, export, *args):
+    async with AdminSessionLocal() as db:
+        await _set_snapshot(db, snapshot_id)
+        return await export(db, *args)
+
+async def export_models(models, timestamp, since=None, progress=None, format="csv"):
+    """Export all models concurrently, each on its own connection, from one shared snapshot.
+
+    With `since`, only rows changed after it are written, plus a tombstones file
+    for rows deleted after it. Returns the filenames and the watermark the next
+    incremental export should start from. `progress(rows=, bytes=)` is
+    called after every batch written.
+    """
+    async with AdminSessionLocal() as coordinator:
+        await coordinator.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        result = await coordinator.execute(text("SELECT pg_export_snapshot(), now()"))
+        snapshot_id, snapshot_time = result.one()
+        exports = [(export_model_to_file, model, timestamp, since, progress, format) for model in models]
+        if since is not None:
+            exports.append((
+                export_query_to_file, tombstones_query(models, since), f"tombstones_delta_{timestamp}.{format}", progress,
+            ))
+        # The snapshot stays importable only while the coordinator transaction is open
+        files = await asyncio.gather(
+            *(_export_in_snapshot(snapshot_id, *export) for export in exports)
+        )
+    return files, snapshot_time - timedelta(seconds=WATERMARK_OVERLAP)
+
+def _read_watermark():
+    try:
+        with open(WATERMARK_FILE, encoding='utf-8') as f:
+            return datetime.fromisoformat(json.load(f)["watermark"])
+    except FileNotFoundError:
+        return None
+
+def _write_watermark(state: dict):
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    # Write then rename so a crash never leaves a truncated watermark behind
+    tmp = WATERMARK_FILE + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, WATERMARK_FILE)
+
+async def read_watermark():
+    """Where the next incremental export starts, or None before the first export."""
+    return await asyncio.to_thread(_read_watermark)
+
+async def write_watermark(watermark, files):
+    state = {
+        "watermark": watermark.isoformat(),
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+    }
+    await asyncio.to_thread(_write_watermark, state)
+
+async def stream_model_csv(model, compress: bool = False):
+    """Yield CSV (optionally gzip) chunks for the model's table, one chunk per batch."""
+    fields = [col.name for col in data_columns(model)]
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(rows, header=None):
+        chunk = encode_csv(rows, header=header).encode('utf-8')
+        return compressor.compress(chunk) if compressor else chunk
+
+    async with AdminSessionLocal() as db:
+        yield encode([], header=fields)
+        async for rows in iter_model_batches(db, model):
+            yield await asyncio.to_thread(encode, rows)
+    if compressor:
+        yield compressor.flush()
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+# Import jobs commit after this many rows instead of holding one huge transaction; 0 = all or nothing
+IMPORT_COMMIT_ROWS = int(os.getenv("IMPORT_COMMIT_ROWS", "50000"))
+
+def _parse_bool(val):
+    return val.lower() in ('true', '1', 'yes')
+
+_PARSERS = {
+    uuid.UUID: uuid.UUID,
+    bool: _parse_bool,
+    datetime: datetime.fromisoformat,
+}
+
+def _column_fallback(col):
+    """Value used for an empty cell, mirroring the column default the ORM would apply."""
+    if col.default is not None:
+        if col.default.is_scalar:
+            return lambda: col.default.arg
+        if col.default.is_callable:
+            return lambda: col.default.arg(None)
+    if col.server_default is not None and col.type.python_type is datetime:
+        # COPY bypasses server defaults; the only ones on our tables are now()
+        return lambda: datetime.now(timezone.utc)
+    return lambda: None
+
+def _make_converter(parse, fallback):
+    def convert(val):
         if val is None or val == '':
-            continue
-        col_type = str(col.type).upper()
-        if 'UUID' in col_type:
-            val = uuid.UUID(val)
-        elif 'BOOLEAN' in col_type:
-            val = val.lower() in ('true', '1', 'yes')
-        elif 'DATETIME' in col_type or 'TIMESTAMP' in col_type:
-            val = datetime.fromisoformat(val)
-        parsed[col.name] = val
-    return parsed 
\ No newline at end of file
+            return fallback()
+        return parse(val)
+    return convert
+
+@lru_cache(maxsize=None)
+def column_converters(model):
+    """Per-column parse functions for a model, built once from the column python types."""
+    return {
+        col.name: _make_converter(_PARSERS.get(col.type.python_type, str), _column_fallback(col))
+        for col in data_columns(model)
+    }
+
+def build_row_converter(model, header):
+    """Return the model's column names and a function mapping a CSV row to a record tuple."""
+    converters = column_converters(model)
+    positions = {name: i for i, name in enumerate(header)}
+    plan = [(positions.get(name), convert) for name, convert in converters.items()]
+
+    def convert_row(row):
+        return tuple(
+            convert(row[i] if i is not None and i < len(row) else None) for i, convert in plan
+        )
+    return list(converters), convert_row
+
+async def iter_csv_batches(upload, batch_size: int = IMPORT_BATCH_SIZE):
+    """Yield (header, rows) batches from an uploaded CSV without reading it all into memory."""
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+    try:
+        reader = csv.reader(stream)
+        header = await asyncio.to_thread(next, reader, None)
+        if header is None:
+            return
+        while rows := await asyncio.to_thread(lambda: list(islice(reader, batch_size))):
+            yield header, rows
+    finally:
+        stream.detach()
+
+async def iter_csv_records(model, upload, batch_size: int = IMPORT_BATCH_SIZE):
+    """Yield (column names, record tuples, bytes read) batches parsed from a CSV upload.
+
+    Bytes read is the file offset, which runs a little ahead of the rows returned.
+    """
+    convert_row = None
+    async for header, rows in iter_csv_batches(upload, batch_size):
+        if convert_row is None:
+            columns, convert_row = build_row_converter(model, header)
+        yield columns, [convert_row(row) for row in rows], upload.file.tell()
+
+async def iter_parquet_records(model, upload, batch_size: int = IMPORT_BATCH_SIZE):
+    """Yield (column names, record tuples, bytes read) batches from a Parquet upload; values are already typed."""
+    size = upload.file.seek(0, os.SEEK_END)
+    parquet = await asyncio.to_thread(open_parquet, upload.file)
+    position = parquet_position(parquet, size)
+    read = 0
+    present = set(parquet.schema_arrow.names)
+    columns = [col for col in data_columns(model) if col.name in present]
+    # Nulls get the same defaults as empty CSV cells; columns without one are passed through
+    fallbacks = [
+        (i, _column_fallback(col)) for i, col in enumerate(columns)
+        if col.default is not None or col.server_default is not None
+    ]
+    names = [col.name for col in columns]
+    batches = parquet.iter_batches(batch_size=batch_size, columns=names)
+    while batch := await asyncio.to_thread(read_parquet_batch, batches, names):
+        _, records = batch
+        if fallbacks:
+            records = [_fill_nulls(record, fallbacks) for record in records]
+        read += len(records)
+        yield names, records, position(read)
+
+def _fill_nulls(record, fallbacks):
+    if all(record[i] is not None for i, _ in fallbacks):
+        return record
+    record = list(record)
+    for i, fallback in fallbacks:
+        if record[i] is None:
+            record[i] = fallback()
+    return tuple(record)
+
+def iter_file_records(model, upload):
+    if is_parquet(upload.filename):
+        return iter_parquet_records(model, upload)
+    return iter_csv_records(model, upload)
+
+async def copy_records(db, table, columns, records):
+    """Bulk load records with COPY on the session's underlying asyncpg connection."""
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+
+async def upsert_records(db, table, columns, records, on_conflict):
+    """Multi-row INSERT that updates or skips rows whose primary key already exists."""
+    stmt = pg_insert(table)
+    keys = [col.name for col in table.primary_key.columns]
+    if on_conflict == 'update':
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: stmt.excluded[name] for name in columns if name not in keys},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+    await db.execute(stmt, [dict(zip(columns, record)) for record in records])
+
+async def import_file(db, model, upload, on_conflict='fail', commit_every: int = 0, progress=None):
+    """Load one CSV or Parquet upload into the model's table in batches and return load statistics.
+
+    With `commit_every`, the session commits each time that many rows have been
+    loaded, so a large file is not one giant transaction (and a failure keeps
+    the rows committed so far). `progress(rows=, bytes=)` is called per batch.
+    """
+    table = model.__table__
+    started = time.perf_counter()
+    total = uncommitted = 0
+    position = 0
+    # The asyncpg adapter begins its transaction lazily on the first statement;
+    # issue one so COPY runs inside the caller's transaction.
+    await db.execute(text("SELECT 1"))
+    async for columns, records, read_to in iter_file_records(model, upload):
+        if on_conflict == 'fail':
+            await copy_records(db, table, columns, records)
+        else:
+            await upsert_records(db, table, columns, records, on_conflict)
+        total += len(records)
+        uncommitted += len(records)
+        logger.info("Imported %d rows into %s from %s", total, table.name, upload.filename)
+        if commit_every and uncommitted >= commit_every:
+            await db.commit()
+            await db.execute(text("SELECT 1"))
+            uncommitted = 0
+        if progress:
+            progress(rows=len(records), bytes=read_to - position)
+            position = read_to
+    elapsed = time.perf_counter() - started
+    return {
+        "filename": upload.filename,
+        "table": table.name,
+        "rows": total,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed) if elapsed else total,
+    }
+
+async def apply_tombstones(db, upload, models):
+    """Delete the rows listed in a tombstones file, children before parents so foreign keys hold.
+
+    Rows that are already gone are skipped, so applying a delta twice is harmless.
+    """
+    started = time.perf_counter()
+    ids = {model.__tablename__: [] for model in models}
+    async for columns, records, _ in iter_file_records(Tombstone, upload):
+        table_at, row_at = columns.index("table_name"), columns.index("row_id")
+        for record in records:
+            if record[table_at] in ids:
+                ids[record[table_at]].append(record[row_at])
+    total = 0
+    for model in reversed(models):
+        table = model.__table__
+        table_ids = ids[table.name]
+        for i in range(0, len(table_ids), IMPORT_BATCH_SIZE):
+            batch = bindparam("ids", table_ids[i:i + IMPORT_BATCH_SIZE], type_=ARRAY(PG_UUID(as_uuid=True)))
+            result = await db.execute(delete(table).where(table.c.id == any_(batch)))
+            total += result.rowcount
+    elapsed = time.perf_counter() - started
+    logger.info("Deleted %d rows from tombstones in %s", total, upload.filename)
+    return {
+        "filename": upload.filename,
+        "table": Tombstone.__tablename__,
+        "rows": total,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed) if elapsed else total,
+    }
@@ -0,0 +1,225 @@
+import json
+from abc import ABC, abstractmethod
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from fastapi import Response
+from .profiling import record_serialization
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_URL = os.getenv("CACHE_URL")  # e.g. redis://localhost:6379/0 for a cache shared by all workers
+
+# Bump when the cached JSON shape changes so old entries are never served
+CACHE_FORMAT = "v1"
+
+class CacheBackend(ABC):
+    """Storage for serialized responses plus per-name version counters.
+
+    Entries are immutable: a write never overwrites a cached response, it
+    bumps the version of the names it affects so readers build new keys.
+    """
+
+    # Whether every worker sees the same entries and versions; per-process
+    # backends are invalidated from the change feed instead (see apply_change)
+    shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None: ...
+
+    @abstractmethod
+    async def version(self, name: str) -> int: ...
+
+    @abstractmethod
+    async def bump(self, name: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+class LRUCache(CacheBackend):
+    """In-process LRU with a TTL. Each worker has its own copy, kept current by apply_change."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        self._clock = 0
+        # Version of names with no counter; raised past every issued version
+        # whenever counters are dropped, so dropped names never reuse a version
+        self._floor = 0
+        self.hits = self.misses = self.evictions = 0
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def version(self, name):
+        return self._versions.get(name, self._floor)
+
+    async def bump(self, name):
+        self._clock += 1
+        self._versions[name] = self._clock
+        self._versions.move_to_end(name)
+        if len(self._versions) > self.max_entries:
+            self._versions.popitem(last=False)
+            self._clock += 1
+            self._floor = self._clock
+
+    async def clear(self):
+        self._entries.clear()
+        self._versions.clear()
+        self._clock += 1
+        self._floor = self._clock
+
+    def stats(self):
+        return {
+            "backend": "lru",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class RedisCache(CacheBackend):
+    """Cache shared by all workers. Requires `uv sync --extra redis`."""
+
+    PREFIX = "projects-app:cache:"
+    shared = True
+
+    def __init__(self, url: str, ttl: float = CACHE_TTL):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+        self.hits = self.misses = 0
+
+    async def get(self, key):
+        value = await self._redis.get(self.PREFIX + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key, value):
+        await self._redis.set(self.PREFIX + key, value, ex=max(1, int(self.ttl)))
+
+    @property
+    def _version_ttl(self) -> int:
+        # Every read refreshes it and entries are written right after a read, so a
+        # counter only expires once all entries built from it have, and a restart
+        # from 0 cannot reach a live entry
+        return 2 * max(1, int(self.ttl))
+
+    async def version(self, name):
+        value = await self._redis.getex(self.PREFIX + "version:" + name, ex=self._version_ttl)
+        return int(value or 0)
+
+    async def bump(self, name):
+        key = self.PREFIX + "version:" + name
+        async with self._redis.pipeline(transaction=True) as pipe:
+            await pipe.incr(key).expire(key, self._version_ttl).execute()
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=self.PREFIX + "*"):
+            await self._redis.delete(key)
+
+    def stats(self):
+        # Evictions happen inside Redis; see its `evicted_keys` stat
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses, "evictions": None}
+
+response_cache: CacheBackend = RedisCache(CACHE_URL) if CACHE_URL else LRUCache()
+
+def task_key(task_id) -> str:
+    return f"task:{task_id}"
+
+def project_key(project_id) -> str:
+    return f"project:{project_id}"
+
+def project_tasks_key(project_id) -> str:
+    return f"project_tasks:{project_id}"
+
+def _pack(body: bytes, headers: dict) -> bytes:
+    # json.dumps escapes newlines, so the first line always holds the headers
+    return json.dumps(headers).encode("utf-8") + b"\n" + body
+
+def _unpack(entry: bytes) -> tuple[bytes, dict]:
+    headers, body = entry.split(b"\n", 1)
+    return body, json.loads(headers)
+
+async def read_through(
+    name: str,
+    load: Callable[[], Awaitable],
+    encode: Callable[[object], bytes],
+    variant: str = "",
+    headers: Callable[[object], dict] = lambda value: {},
+) -> Optional[Response]:
+    """Serve `name` from the cache, or load, serialize and cache it.
+
+    `variant` distinguishes representations of the same entity. Callers pass
+    the response ETag, which covers the fingerprint and any pagination params,
+    so a cached body is only ever served with the ETag it was built for (a
+    stale worker or replica misses instead). Returns None when `load` finds
+    nothing; misses are not cached.
+    """
+    key = entry = None
+    if CACHE_ENABLED:
+        # Read the version before loading so a concurrent write makes this entry unreachable
+        key = f"{CACHE_FORMAT}:{name}@{await response_cache.version(name)}:{variant}"
+        entry = await response_cache.get(key)
+    if entry is None:
+        value = await load()
+        if value is None:
+            return None
+        started = time.perf_counter()
+        entry = _pack(encode(value), headers(value))
+        record_serialization(time.perf_counter() - started)
+        if key is not None:
+            await response_cache.set(key, entry)
+    body, cached_headers = _unpack(entry)
+    return Response(body, media_type="application/json", headers=cached_headers)
+
+async def invalidate(*names: str):
+    if not CACHE_ENABLED:
+        return
+    for name in set(names):
+        await response_cache.bump(name)
+
+def change_names(event: dict) -> list[str]:
+    """Cache names a change-feed event affects, mirroring what the writer invalidated."""
+    project_ids = event.get("project_ids", [])
+    names = [name for project_id in project_ids for name in (project_key(project_id), project_tasks_key(project_id))]
+    if event["entity"] == "task":
+        names += [task_key(task_id) for task_id in event.get("ids", [])]
+    elif event["entity"] == "project":
+        names += [name for project_id in event.get("ids", []) for name in (project_key(project_id), project_tasks_key(project_id))]
+    return names
+
+async def apply_change(event: dict):
+    """Change-feed listener: applies another worker's write to this worker's cache."""
+    if event["op"] == "reset":
+        await response_cache.clear()
+    else:
+        await invalidate(*change_names(event))
@@ -0,0 +1,107 @@
+"""Negotiated gzip/brotli compression of whole response bodies.
+
+Brotli is used when the `brotli` package is installed (`uv sync --extra brotli`)
+and the client accepts it; otherwise gzip.
+"""
+import asyncio
+import gzip
+import os
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("true", "1", "yes")
+# Smaller bodies are sent as-is; compressing them saves less than it costs
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Larger bodies are compressed in a thread so the event loop keeps serving
+THREAD_MIN_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = {"application/json", "text/plain", "text/csv", "text/html"}
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The accepted coding with the highest q-value, br winning ties; None for identity."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            weights[coding] = q
+    default = weights.get("*", 0.0)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(supported, key=lambda coding: weights.get(coding, default))
+    return best if weights.get(best, default) > 0 else None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing complete responses of at least `min_size` bytes.
+
+    Streamed bodies (CSV exports, event streams) pass through untouched. A compressed
+    response's ETag becomes weak, as the bytes differ from the identity encoding;
+    If-None-Match uses weak comparison, so revalidation still matches.
+    """
+
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            initial, start = start, None
+            headers = MutableHeaders(scope=initial)
+            body = message.get("body", b"")
+            media_type = headers.get("content-type", "").split(";")[0].strip()
+            if (
+                message.get("more_body")
+                or len(body) < self.min_size
+                or media_type not in COMPRESSIBLE_TYPES
+                or "content-encoding" in headers
+            ):
+                await send(initial)
+                await send(message)
+                return
+            if len(body) >= THREAD_MIN_SIZE:
+                body = await asyncio.to_thread(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(initial)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
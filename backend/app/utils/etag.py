@@ -0,0 +1,24 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+def make_etag(*parts) -> str:
+    """Strong ETag derived from whatever identifies a representation (fingerprints, query params)."""
+    digest = hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response when the client already holds `etag`, otherwise None."""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
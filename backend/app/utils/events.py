@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Optional
+from uuid import UUID, uuid4
+import asyncpg
+from sqlalchemy import func, select
+from ..database import DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
+
+logger = logging.getLogger(__name__)
+
+CHANGES_CHANNEL = "changes"
+# LISTEN needs a session-level connection, so this must not point at a transaction-mode PgBouncer
+EVENTS_DSN = os.getenv(
+    "EVENTS_DSN", f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+EVENTS_HISTORY = int(os.getenv("EVENTS_HISTORY", "1000"))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7900
+
+def _reset_event() -> dict:
+    """Tells clients their view may be stale and they should refetch."""
+    return {"id": uuid4().hex, "entity": "all", "op": "reset", "ids": [], "project_ids": []}
+
+def _change_payloads(entity: str, op: str, changes: list[tuple[str, set[str]]]) -> list[str]:
+    """Split one change into payloads under NOTIFY_MAX_BYTES.
+
+    `changes` pairs each id with the project ids it touches. A pair is never
+    split, so every payload names the projects of the ids inside it and a
+    project subscriber hears about each of its rows.
+    """
+    def encode(chunk_ids, chunk_project_ids):
+        return json.dumps({
+            "id": uuid4().hex, "entity": entity, "op": op, "ids": chunk_ids, "project_ids": sorted(chunk_project_ids),
+        })
+
+    budget = NOTIFY_MAX_BYTES - len(encode([], []))
+    payloads, ids, project_ids, used = [], [], set(), 0
+    for change_id, change_project_ids in changes:
+        new_project_ids = set(change_project_ids) - project_ids
+        # Quotes plus the separator for each value
+        size = sum(len(value) + 4 for value in [change_id, *new_project_ids])
+        if used + size > budget and ids:
+            payloads.append(encode(ids, project_ids))
+            ids, project_ids, used = [], set(), 0
+            new_project_ids = set(change_project_ids)
+            size = sum(len(value) + 4 for value in [change_id, *new_project_ids])
+        ids.append(change_id)
+        project_ids |= new_project_ids
+        used += size
+    payloads.append(encode(ids, project_ids))
+    return payloads
+
+async def notify_change(db, entity: str, op: str, changes: Iterable[tuple]):
+    """Queue a change event on the session's transaction; Postgres delivers it on commit.
+
+    `changes` holds (id, project_ids) pairs: each changed row and the projects it
+    belongs to (before and after, for a task that moved).
+    """
+    changes = [
+        (str(change_id), {str(p) for p in project_ids if p is not None}) for change_id, project_ids in changes
+    ]
+    for payload in _change_payloads(entity, op, changes):
+        await db.execute(select(func.pg_notify(CHANGES_CHANNEL, payload)))
+
+async def notify_reset(db):
+    event = _reset_event()
+    await db.execute(select(func.pg_notify(CHANGES_CHANNEL, json.dumps(event))))
+
+class Subscription:
+    def __init__(self, project_id: Optional[UUID]):
+        self.project_id = str(project_id) if project_id else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+
+    def wants(self, event: dict) -> bool:
+        if self.project_id is None or event["op"] == "reset":
+            return True
+        return self.project_id in event["project_ids"]
+
+    def offer(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog and tell it to refetch instead of buffering without bound
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_reset_event())
+
+class ChangeFeed:
+    """One LISTEN connection per worker, fanned out to SSE subscribers.
+
+    Every worker receives notifications in the same commit order, so the
+    recent-history buffer lets a client resume from its Last-Event-ID on
+    any worker. Unknown ids (too old, or lost while reconnecting) resume
+    with a reset event.
+    """
+
+    def __init__(self, dsn: str = EVENTS_DSN, history: int = EVENTS_HISTORY):
+        self.dsn = dsn
+        self.history: deque = deque(maxlen=history)
+        self.subscribers: set[Subscription] = set()
+        # In-process consumers of every event (e.g. the per-worker response cache)
+        self.listeners: list[Callable[[dict], Awaitable[None]]] = []
+        self._listener_tasks: set[asyncio.Task] = set()
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lost = asyncio.Event()
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change event: %r", payload)
+            return
+        self.publish(event)
+
+    def publish(self, event: dict):
+        self.history.append(event)
+        for subscription in list(self.subscribers):
+            if subscription.wants(event):
+                subscription.offer(event)
+        for listener in self.listeners:
+            task = asyncio.get_running_loop().create_task(self._call(listener, event))
+            self._listener_tasks.add(task)
+            task.add_done_callback(self._listener_tasks.discard)
+
+    async def _call(self, listener, event: dict):
+        try:
+            await listener(event)
+        except Exception:
+            logger.exception("Change listener failed for %r", event)
+
+    def _on_termination(self, conn):
+        self._lost.set()
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                self._conn = await asyncpg.connect(self.dsn)
+                self._conn.add_termination_listener(self._on_termination)
+                await self._conn.add_listener(CHANGES_CHANNEL, self._on_notify)
+                delay = 1.0
+                self._lost.clear()
+                await self._lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change feed connection failed; retrying in %.0fs", delay)
+            # Notifications sent while disconnected are gone; make clients refetch
+            self.history.clear()
+            self.publish(_reset_event())
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    def subscribe(self, project_id: Optional[UUID] = None, last_event_id: Optional[str] = None) -> Subscription:
+        subscription = Subscription(project_id)
+        if last_event_id is not None:
+            ids = [event["id"] for event in self.history]
+            if last_event_id in ids:
+                for event in list(self.history)[ids.index(last_event_id) + 1:]:
+                    if subscription.wants(event):
+                        subscription.offer(event)
+            else:
+                subscription.offer(_reset_event())
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+change_feed = ChangeFeed()
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['entity']}.{event['op']}\ndata: {json.dumps(event)}\n\n"
+
+async def stream_events(request, subscription: Subscription):
+    """SSE body: events as they arrive, a comment heartbeat when idle, until the client leaves."""
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        change_feed.unsubscribe(subscription)
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+from pydantic_core import to_json
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import func
+from ..database import AsyncSessionLocal
+from ..models.admin_job import AdminJob
+
+logger = logging.getLogger(__name__)
+
+# Admin jobs run at most this many at a time per worker; each also draws from the
+# separate DB_ADMIN_POOL_SIZE pool, never from the pool serving requests
+JOBS_MAX_CONCURRENCY = int(os.getenv("JOBS_MAX_CONCURRENCY", "1"))
+# Finished jobs kept for GET /api/admin/jobs/{id}
+JOBS_HISTORY = int(os.getenv("JOBS_HISTORY", "100"))
+# On shutdown, seconds running jobs get to finish before they are cancelled
+JOBS_SHUTDOWN_TIMEOUT = float(os.getenv("JOBS_SHUTDOWN_TIMEOUT", "30"))
+# How often a worker writes the progress of its unfinished jobs to admin_jobs
+JOBS_SYNC_INTERVAL = float(os.getenv("JOBS_SYNC_INTERVAL", "1"))
+# An unfinished job not written for this long belonged to a worker that died
+JOBS_LOST_AFTER = max(30.0, 10 * JOBS_SYNC_INTERVAL)
+
+UNFINISHED = ("queued", "running")
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+@dataclass
+class Job:
+    kind: str
+    id: str = field(default_factory=lambda: uuid4().hex)
+    status: str = "queued"  # queued, running, succeeded, failed, cancelled, lost
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rows: int = 0
+    bytes: int = 0
+    # Known up front for imports (upload size); used for the ETA
+    total_bytes: Optional[int] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    def progress(self, rows: int = 0, bytes: int = 0):
+        self.rows += rows
+        self.bytes += bytes
+
+    def elapsed_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or _now()) - self.started_at).total_seconds()
+
+    def eta_seconds(self) -> Optional[float]:
+        if self.status != "running" or not self.total_bytes or not self.bytes:
+            return None
+        elapsed = self.elapsed_seconds()
+        return max(0.0, elapsed * (self.total_bytes - self.bytes) / self.bytes)
+
+    def to_dict(self) -> dict:
+        elapsed = self.elapsed_seconds()
+        eta = self.eta_seconds()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": {
+                "rows": self.rows,
+                "bytes": self.bytes,
+                "total_bytes": self.total_bytes,
+                "percent": round(100 * self.bytes / self.total_bytes, 1) if self.total_bytes else None,
+                "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+            },
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def to_row(self) -> dict:
+        return {
+            "id": self.id, "kind": self.kind, "status": self.status,
+            "created_at": self.created_at, "started_at": self.started_at, "finished_at": self.finished_at,
+            "rows": self.rows, "bytes": self.bytes, "total_bytes": self.total_bytes,
+            # Results may hold datetimes; store them as the API returns them
+            "result": json.loads(to_json(self.result)) if self.result is not None else None,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_row(cls, row: AdminJob) -> "Job":
+        job = cls(**{name: getattr(row, name) for name in cls.__dataclass_fields__})
+        if job.status in UNFINISHED and row.updated_at < _now() - timedelta(seconds=JOBS_LOST_AFTER):
+            job.status = "lost"
+        return job
+
+class JobRunner:
+    """Queue of admin jobs, drained by a fixed number of worker tasks in this process.
+
+    A job runs in the worker that accepted it, but its status is written to the
+    admin_jobs table, so any worker can answer GET /api/admin/jobs/{id}. Jobs
+    still queued or running when their worker dies are reported as "lost".
+    """
+
+    def __init__(self, concurrency: int = JOBS_MAX_CONCURRENCY, history: int = JOBS_HISTORY,
+                 sync_interval: float = JOBS_SYNC_INTERVAL):
+        self.concurrency = concurrency
+        self.history = history
+        self.sync_interval = sync_interval
+        # Unfinished jobs of this process
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._sync_task: Optional[asyncio.Task] = None
+
+    async def _save(self, *jobs: Job):
+        rows = [job.to_row() for job in jobs]
+        if not rows:
+            return
+        stmt = pg_insert(AdminJob).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AdminJob.id],
+            set_={**{name: stmt.excluded[name] for name in rows[0] if name != "id"}, "updated_at": func.now()},
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    async def _save_quietly(self, *jobs: Job):
+        # Status writes must never fail the job itself
+        try:
+            await self._save(*jobs)
+        except Exception:
+            logger.exception("Could not record admin job status")
+
+    async def _prune(self):
+        keep = select(AdminJob.id).order_by(AdminJob.created_at.desc()).limit(self.history)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(AdminJob).where(AdminJob.finished_at.isnot(None), AdminJob.id.not_in(keep))
+            )
+            await db.commit()
+
+    async def submit(self, kind: str, run: Callable[[Job], Awaitable[dict]], total_bytes: Optional[int] = None,
+                     cleanup: Optional[Callable[[], None]] = None) -> Job:
+        """Record and queue `run(job)`; its return value becomes the job result. `cleanup` runs however it ends."""
+        job = Job(kind=kind, total_bytes=total_bytes)
+        # Written before it is queued, so every worker can find it as soon as it is returned
+        await self._save(job)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((job, run, cleanup))
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        if job_id in self.jobs:
+            return self.jobs[job_id]
+        async with AsyncSessionLocal() as db:
+            row = await db.get(AdminJob, job_id)
+        return Job.from_row(row) if row is not None else None
+
+    async def recent(self) -> list[Job]:
+        """Recent jobs of all workers, newest first."""
+        async with AsyncSessionLocal() as db:
+            rows = await db.scalars(select(AdminJob).order_by(AdminJob.created_at.desc()).limit(self.history))
+            return [self.jobs.get(row.id) or Job.from_row(row) for row in rows]
+
+    async def _finish(self, job: Job, status: str, cleanup):
+        job.status, job.finished_at = status, _now()
+        if cleanup:
+            cleanup()
+        self.jobs.pop(job.id, None)
+        await self._save_quietly(job)
+
+    async def _execute(self, job: Job, run, cleanup):
+        job.status, job.started_at = "running", _now()
+        await self._save_quietly(job)
+        status = "failed"
+        try:
+            job.result = await run(job)
+            status = "succeeded"
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            logger.exception("Admin job %s (%s) failed", job.id, job.kind)
+            job.error = str(e)
+        finally:
+            await self._finish(job, status, cleanup)
+            try:
+                await self._prune()
+            except Exception:
+                logger.exception("Could not prune admin job history")
+
+    async def _work(self):
+        while True:
+            job, run, cleanup = await self._queue.get()
+            try:
+                await self._execute(job, run, cleanup)
+            finally:
+                self._queue.task_done()
+
+    async def _sync(self):
+        """Heartbeat: write progress of this worker's unfinished jobs."""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self._save_quietly(*self.jobs.values())
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+            self._sync_task = asyncio.create_task(self._sync())
+
+    async def stop(self, timeout: float = 0):
+        """Cancel queued jobs, give running ones up to `timeout` seconds, then cancel those too."""
+        # Jobs that never started will not run in this process
+        while not self._queue.empty():
+            job, _, cleanup = self._queue.get_nowait()
+            await self._finish(job, "cancelled", cleanup)
+            self._queue.task_done()
+        if timeout > 0 and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Admin jobs still running after %.0fs; cancelling them", timeout)
+        tasks = [*self._workers, *([self._sync_task] if self._sync_task else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers, self._sync_task = [], None
+
+job_runner = JobRunner()
@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple, Union
+from uuid import UUID
+from fastapi import HTTPException
+
+# (sort key, id): the sort key is a timestamp, or a float such as a search rank
+Cursor = Tuple[Union[datetime, float], UUID]
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(key: Union[datetime, float], id: UUID) -> str:
+    """Opaque cursor pointing just past the given (sort key, id) row."""
+    payload = json.dumps([key.isoformat() if isinstance(key, datetime) else key, str(id)]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverse of encode_cursor; raises ValueError on anything it did not produce."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key, id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(key, str):
+            return datetime.fromisoformat(key), UUID(id)
+        return float(key), UUID(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def next_cursor(rows, limit: int, timestamp_field: str) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page."""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    if isinstance(last, dict):
+        return encode_cursor(last[timestamp_field], last["id"])
+    return encode_cursor(getattr(last, timestamp_field), last.id)
+
+def _cursor_param(key_type: type):
+    def cursor_param(cursor: Optional[str] = None) -> Optional[Cursor]:
+        """FastAPI dependency that decodes the `cursor` query parameter."""
+        if cursor is None:
+            return None
+        try:
+            decoded = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # A cursor from another listing (e.g. a search rank on a timestamp-ordered list)
+        if not isinstance(decoded[0], key_type):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return decoded
+    return cursor_param
+
+# For lists ordered by a timestamp (updated_at, last_accessed)
+cursor_param = _cursor_param(datetime)
+# For search results ordered by rank
+rank_cursor_param = _cursor_param(float)
@@ -0,0 +1,106 @@
+"""Parquet export/import for the admin backup path. Requires `uv sync --extra parquet`.
+
+Columns keep their types (UUIDs as 16-byte binary, timestamps in UTC, booleans),
+so import needs no per-cell string parsing. Each DB batch becomes one row group.
+"""
+import uuid
+from datetime import datetime
+
+PARQUET_COMPRESSION = "zstd"
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet export/import requires pyarrow: uv sync --extra parquet") from e
+    return pyarrow
+
+def _arrow_type(pa, col):
+    python_type = col.type.python_type
+    if python_type is uuid.UUID:
+        return pa.binary(16)
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is datetime:
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+def arrow_schema(columns):
+    pa = _pyarrow()
+    return pa.schema([
+        pa.field(col.name, _arrow_type(pa, col), nullable=col.nullable, metadata={"python_type": col.type.python_type.__name__})
+        for col in columns
+    ])
+
+class ParquetFileWriter:
+    """Writes DB row batches to a Parquet file, one row group per batch. Not async; call from a thread."""
+
+    def __init__(self, path: str, columns):
+        pa = _pyarrow()
+        self._pa = pa
+        self.schema = arrow_schema(columns)
+        self._uuid = [pa.types.is_fixed_size_binary(field.type) for field in self.schema]
+        self._sink = pa.OSFile(path, "wb")
+        self._writer = pa.parquet.ParquetWriter(self._sink, self.schema, compression=PARQUET_COMPRESSION)
+
+    def write(self, rows) -> int:
+        """Append a batch; returns the bytes it added to the file."""
+        before = self._sink.tell()
+        arrays = []
+        for i, (field, is_uuid) in enumerate(zip(self.schema, self._uuid)):
+            values = [row[i] for row in rows]
+            if is_uuid:
+                values = [None if value is None else value.bytes for value in values]
+            arrays.append(self._pa.array(values, type=field.type))
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        return self._sink.tell() - before
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+
+def _to_python(pa, column):
+    values = column.to_pylist()
+    if pa.types.is_fixed_size_binary(column.type):
+        return [None if value is None else uuid.UUID(bytes=value) for value in values]
+    return values
+
+def open_parquet(file):
+    """A ParquetFile over an open binary file object."""
+    return _pyarrow().parquet.ParquetFile(file)
+
+def parquet_position(parquet, size: int):
+    """Map rows read so far to the bytes of the file they stand for, from the row-group metadata.
+
+    The reader seeks to the footer first and then between column chunks, so the
+    file offset says nothing about progress. Each row group counts its compressed
+    chunks in proportion to the rows read from it; the last row accounts for the
+    whole `size`, header and footer included.
+    """
+    metadata = parquet.metadata
+    groups = []
+    for i in range(metadata.num_row_groups):
+        group = metadata.row_group(i)
+        groups.append((group.num_rows, sum(group.column(c).total_compressed_size for c in range(group.num_columns))))
+
+    def position(rows: int) -> int:
+        if rows >= metadata.num_rows:
+            return size
+        read = 0
+        for group_rows, group_bytes in groups:
+            if rows < group_rows:
+                return read + group_bytes * rows // group_rows
+            rows -= group_rows
+            read += group_bytes
+        return read
+    return position
+
+def read_parquet_batch(batches, names):
+    """Next batch from `iter_batches` as (column names, record tuples), or None when done."""
+    pa = _pyarrow()
+    batch = next(batches, None)
+    if batch is None:
+        return None
+    columns = [_to_python(pa, batch.column(name)) for name in names]
+    return names, list(zip(*columns))
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Off by default: when disabled no SQLAlchemy listeners or middleware are installed
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("true", "1", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("true", "1", "yes")
+# Explain a given statement at most this often, so a hot slow query does not flood the log
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+EXPLAINABLE = ("select", "insert", "update", "delete", "with", "values")
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class Histogram:
+    """Prometheus-style cumulative histogram, kept per process."""
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = SECONDS_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> (per-bucket counts with a trailing +Inf slot, [sum])
+        self._series: dict[tuple, tuple[list, list]] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in self._series.items():
+            labels = [f'{k}="{v}"' for k, v in zip(self.labels, label_values)]
+            cumulative = 0
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+                cumulative += count
+                bucket_labels = ",".join([*labels, f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total[0]}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+class Gauge:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+
+    def set(self, value: float, *label_values):
+        self.values[label_values] = value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for label_values, value in self.values.items():
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time to produce the response.", ("method", "route", "status")
+)
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements issued per request.", ("route",), COUNT_BUCKETS
+)
+request_db_time = Histogram("http_request_db_seconds", "Time spent in SQL per request.", ("route",))
+request_pool_wait = Histogram(
+    "http_request_pool_wait_seconds", "Time spent waiting for a pooled connection per request.", ("route",)
+)
+request_serialize_time = Histogram(
+    "http_request_serialize_seconds", "Time spent encoding response bodies per request.", ("route",)
+)
+query_duration = Histogram("db_query_duration_seconds", "Duration of individual SQL statements.", ("statement",))
+slow_queries = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+# Set once per worker by the lifespan, whether or not profiling is enabled
+startup_seconds = Gauge("app_startup_seconds", "Worker cold start by phase.", ("phase",))
+
+METRICS = [
+    request_duration, request_queries, request_db_time, request_pool_wait,
+    request_serialize_time, query_duration, slow_queries, startup_seconds,
+]
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+def record_serialization(seconds: float):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+def record_pool_wait(seconds: float):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+_last_explained: dict[str, float] = {}
+
+async def _explain(engine, statement: str, parameters):
+    try:
+        async with engine.connect() as conn:
+            result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(row[0] for row in result)
+        logger.warning("Plan for slow query:\n%s\n%s", statement, plan)
+    except Exception:
+        logger.exception("Could not EXPLAIN slow query")
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _handle_error(context):
+    # after_cursor_execute never runs for a failed statement; drop its start time
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+def _make_after_cursor_execute(engine):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+        query_duration.observe(elapsed, verb)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        if elapsed * 1000 < SLOW_QUERY_MS or verb == "explain":
+            return
+        slow_queries.inc()
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+        now = time.monotonic()
+        if (
+            SLOW_QUERY_EXPLAIN
+            and verb in EXPLAINABLE
+            and not executemany
+            and now - _last_explained.get(statement, -SLOW_QUERY_EXPLAIN_INTERVAL) >= SLOW_QUERY_EXPLAIN_INTERVAL
+        ):
+            _last_explained[statement] = now
+            # Plain EXPLAIN on its own connection: never touches the caller's transaction
+            asyncio.get_running_loop().create_task(_explain(engine, statement, parameters))
+    return after_cursor_execute
+
+def install(*engines):
+    """Attach query timing to the given async engines."""
+    for engine in set(engines):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _make_after_cursor_execute(engine))
+        event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+class ProfilingMiddleware:
+    """Attributes SQL count/time, pool wait and serialization time to each request.
+
+    Adds a Server-Timing header and feeds the /metrics histograms. Pure ASGI,
+    so streaming responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = time.perf_counter() - started
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                    f"pool;dur={stats.pool_wait_seconds * 1000:.2f}, "
+                    f"serialize;dur={stats.serialize_seconds * 1000:.2f}, "
+                    f"total;dur={total * 1000:.2f}"
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_duration.observe(time.perf_counter() - started, scope["method"], route, status)
+            request_queries.observe(stats.queries, route)
+            request_db_time.observe(stats.db_seconds, route)
+            request_pool_wait.observe(stats.pool_wait_seconds, route)
+            request_serialize_time.observe(stats.serialize_seconds, route)
@@ -0,0 +1,37 @@
+from typing import Iterable, Optional, Tuple
+from fastapi import HTTPException
+
+# Parsed `fields=` parameter: requested names, sorted so they hash the same in every worker
+Fields = Tuple[str, ...]
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Fields]:
+    """Parse `fields=a,b,c`; None (no parameter) means every field. Unknown names are a 400."""
+    if fields is None:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(allowed)
+    if not names:
+        raise HTTPException(status_code=400, detail="No fields requested")
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(sorted(names))
+
+def nested_fields(fields: Optional[Fields], name: str) -> Optional[Fields]:
+    """Fields requested under `name` (`tasks.title` -> `title`); None if all of them, () if none."""
+    if fields is None or name in fields:
+        return None
+    prefix = f"{name}."
+    return tuple(field.removeprefix(prefix) for field in fields if field.startswith(prefix))
+
+def select_fields(columns: tuple, fields: Optional[Fields], required: Iterable[str] = ()) -> tuple:
+    """`columns` limited to the requested fields plus `required` ones (sort keys, grouping), in order."""
+    if fields is None:
+        return columns
+    keep = {*fields, *required}
+    return tuple(column for column in columns if column.key in keep)
+
+def hidden_fields(fields: Optional[Fields], selected: Iterable[str]) -> Tuple[str, ...]:
+    """Of the always-selected helper columns, those the client did not ask for."""
+    if fields is None:
+        return ()
+    return tuple(name for name in selected if name not in fields)
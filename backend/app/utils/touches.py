@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import os
+from itertools import islice
+from uuid import UUID
+from ..database import AsyncSessionLocal
+from ..crud import project as project_crud
+
+logger = logging.getLogger(__name__)
+
+TOUCH_FLUSH_INTERVAL = float(os.getenv("TOUCH_FLUSH_INTERVAL", "5"))
+TOUCH_MAX_BATCH = int(os.getenv("TOUCH_MAX_BATCH", "1000"))
+# Distinct ids held while flushes keep failing; further touches are dropped
+TOUCH_MAX_PENDING = int(os.getenv("TOUCH_MAX_PENDING", "100000"))
+
+class TouchAggregator:
+    """Collects project "last accessed" touches and writes them in batches.
+
+    Reads call `touch()`, which only records the id. A background loop
+    flushes the coalesced ids every `flush_interval` seconds, or sooner
+    once `max_batch` ids are pending, with one UPDATE on its own session.
+    """
+
+    def __init__(self, flush_interval: float = TOUCH_FLUSH_INTERVAL, max_batch: int = TOUCH_MAX_BATCH,
+                 max_pending: int = TOUCH_MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending: set[UUID] = set()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def touch(self, project_id: UUID):
+        if len(self._pending) >= self.max_pending and project_id not in self._pending:
+            self.dropped += 1
+            return
+        self._pending.add(project_id)
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    async def flush(self):
+        while self._pending:
+            # Ids leave _pending only once written, so a failed or cancelled
+            # flush (e.g. during stop()) leaves them for the next one
+            batch = list(islice(self._pending, self.max_batch))
+            try:
+                async with AsyncSessionLocal() as db:
+                    await project_crud.touch_projects(db, batch)
+            except Exception:
+                # A late touch is harmless
+                logger.exception("Failed to flush %d project touches", len(batch))
+                return
+            self._pending.difference_update(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+touch_aggregator = TouchAggregator()
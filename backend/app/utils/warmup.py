@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..crud import project as project_crud
+from ..crud import task as task_crud
+from ..database import DB_PGBOUNCER, DB_POOL_SIZE, DB_POOL_WARMUP, engine, read_engine
+
+logger = logging.getLogger(__name__)
+
+# Never matches a row; the statements are prepared all the same
+NO_ID = UUID(int=0)
+
+# The hot read-path statements, one call each
+WARMUP_QUERIES = (
+    lambda db: project_crud.projects_fingerprint(db, limit=1),
+    lambda db: project_crud.get_project_summaries(db, limit=1),
+    lambda db: project_crud.get_projects(db, limit=1),
+    lambda db: project_crud.project_fingerprint(db, NO_ID),
+    lambda db: project_crud.get_project_detail(db, NO_ID),
+    task_crud.tasks_fingerprint,
+    lambda db: task_crud.tasks_fingerprint(db, NO_ID),
+    lambda db: task_crud.get_tasks(db, limit=1),
+    lambda db: task_crud.get_tasks_by_project(db, NO_ID, limit=1),
+    lambda db: task_crud.task_fingerprint(db, NO_ID),
+    lambda db: task_crud.get_task_detail(db, NO_ID),
+)
+
+async def _warm_connection(async_engine):
+    async with async_engine.connect() as conn:
+        async with AsyncSession(bind=conn) as db:
+            for query in WARMUP_QUERIES:
+                await query(db)
+
+async def warm_pools(connections: int = DB_POOL_WARMUP):
+    """Open `connections` pooled connections per engine and prepare the read statements on each.
+
+    Checkouts overlap, so each one gets its own connection and the first requests
+    skip both the connect and the prepare round trips. Failures are logged, not
+    raised: a worker still starts if the database is briefly unavailable.
+    """
+    if DB_PGBOUNCER or connections <= 0:
+        # Nothing to keep warm: without a pool every checkout is a new connection
+        return
+    # More than the pool keeps would only be closed again on return
+    connections = min(connections, DB_POOL_SIZE)
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+    results = await asyncio.gather(
+        *(_warm_connection(e) for e in engines for _ in range(connections)), return_exceptions=True
+    )
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        logger.warning("Pool warmup: %d of %d connections failed: %s", len(failures), len(results), failures[0])
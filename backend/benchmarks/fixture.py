@@ -0,0 +1,171 @@
+"""Throwaway Postgres for benchmarks, plus a deterministic seeder.
+
+Two ways to get a database:
+- "docker": a disposable postgres container on a free local port, removed afterwards
+- "server": a scratch database on the server from .env (e.g. the docker-compose `db`
+  service), dropped afterwards
+
+Either way the DB_* environment variables are pointed at it, so the app must be
+imported only after the fixture has started.
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BENCH_PG_IMAGE = os.getenv("BENCH_PG_IMAGE", "postgres:15")
+
+WORDS = (
+    "invoice report deploy review design meeting budget release backup migrate "
+    "customer onboarding roadmap security audit refactor database frontend api "
+    "billing analytics dashboard notify schedule cleanup"
+).split()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class PostgresFixture:
+    def __init__(self, mode: str = "docker"):
+        if mode not in ("docker", "server"):
+            raise ValueError(f"Unknown database mode: {mode}")
+        self.mode = mode
+        self.user = os.getenv("DB_USER", "taskuser")
+        self.password = os.getenv("DB_PASSWORD", "taskpass")
+        self.host = os.getenv("DB_HOST", "localhost")
+        self.port = os.getenv("DB_PORT", "5432")
+        self.database = f"{os.getenv('DB_NAME', 'taskdb')}_bench_{uuid4().hex[:8]}"
+        self.container = None
+
+    @property
+    def dsn(self) -> str:
+        return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+
+    async def _connect(self, database: str, timeout: float = 60.0) -> asyncpg.Connection:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            try:
+                return await asyncpg.connect(
+                    user=self.user, password=self.password, host=self.host,
+                    port=int(self.port), database=database,
+                )
+            except (OSError, asyncpg.CannotConnectNowError, asyncpg.InvalidCatalogNameError):
+                if asyncio.get_running_loop().time() > deadline:
+                    raise
+                await asyncio.sleep(0.5)
+
+    async def start(self):
+        if self.mode == "docker":
+            self.host, self.port = "127.0.0.1", str(free_port())
+            self.container = f"projects-bench-{uuid4().hex[:8]}"
+            await asyncio.to_thread(subprocess.run, [
+                "docker", "run", "-d", "--rm", "--name", self.container,
+                "-e", f"POSTGRES_USER={self.user}",
+                "-e", f"POSTGRES_PASSWORD={self.password}",
+                "-e", f"POSTGRES_DB={self.database}",
+                "-p", f"{self.port}:5432",
+                BENCH_PG_IMAGE,
+            ], check=True, capture_output=True)
+            # The image restarts the server once after init, so probe the target database itself
+            conn = await self._connect(self.database)
+        else:
+            admin = await self._connect("postgres")
+            try:
+                await admin.execute(f'CREATE DATABASE "{self.database}"')
+            finally:
+                await admin.close()
+            conn = await self._connect(self.database)
+        await conn.close()
+
+        os.environ.update({
+            "DB_USER": self.user, "DB_PASSWORD": self.password,
+            "DB_HOST": self.host, "DB_PORT": self.port, "DB_NAME": self.database,
+        })
+        os.environ.pop("DB_READ_HOST", None)
+        os.environ.pop("EVENTS_DSN", None)
+        await asyncio.to_thread(
+            subprocess.run, [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=BACKEND_DIR, env=os.environ.copy(), check=True, capture_output=True,
+        )
+
+    async def stop(self):
+        if self.container:
+            await asyncio.to_thread(
+                subprocess.run, ["docker", "stop", self.container], capture_output=True
+            )
+            self.container = None
+            return
+        admin = await self._connect("postgres")
+        try:
+            await admin.execute(f'DROP DATABASE IF EXISTS "{self.database}" WITH (FORCE)')
+        finally:
+            await admin.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+async def seed(dsn: str, projects: int, tasks_per_project: int, standalone_tasks: int, seed: int = 0) -> dict:
+    """Replace all data with a reproducible data set; returns the ids benchmarks pick from."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    def moment() -> datetime:
+        return now - timedelta(seconds=rng.randrange(90 * 24 * 3600))
+
+    project_rows, task_rows = [], []
+    for p in range(projects):
+        project_id = UUID(int=rng.getrandbits(128), version=4)
+        created = moment()
+        project_rows.append((project_id, f"Project {p}", _text(rng, 8), created, created, moment()))
+        for t in range(tasks_per_project):
+            created = moment()
+            task_rows.append((
+                UUID(int=rng.getrandbits(128), version=4), f"{_text(rng, 3)} {t}", _text(rng, 12),
+                rng.random() < 0.3, project_id, created, created,
+            ))
+    for t in range(standalone_tasks):
+        created = moment()
+        task_rows.append((
+            UUID(int=rng.getrandbits(128), version=4), f"{_text(rng, 3)} {t}", _text(rng, 12),
+            rng.random() < 0.3, None, created, created,
+        ))
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        async with conn.transaction():
+            # project_stats references projects; tombstones would leak deletions from a previous run
+            await conn.execute("TRUNCATE tasks, projects, project_stats, tombstones")
+            await conn.copy_records_to_table(
+                "projects", records=project_rows,
+                columns=["id", "name", "description", "created_at", "updated_at", "last_accessed"],
+            )
+            await conn.copy_records_to_table(
+                "tasks", records=task_rows,
+                columns=["id", "title", "description", "completed", "project_id", "created_at", "updated_at"],
+            )
+        await conn.execute("ANALYZE projects; ANALYZE tasks")
+    finally:
+        await conn.close()
+    return {
+        "project_ids": [row[0] for row in project_rows],
+        "task_ids": [row[0] for row in task_rows],
+        "words": list(WORDS),
+    }
@@ -0,0 +1,292 @@
+"""Load test for the API against a throwaway, seeded Postgres.
+
+Drives the app in-process through httpx's ASGI transport and over a real
+uvicorn socket, and reports latency percentiles, throughput and SQL queries
+per request for each endpoint. Results are written as JSON and can be
+compared against an earlier run.
+
+Requires `uv sync --extra bench`, plus docker for the default database mode.
+
+    uv run python -m benchmarks.load --output results.json
+    uv run python -m benchmarks.load --db server --baseline results.json --max-regression 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import uvicorn
+
+from .fixture import BACKEND_DIR, PostgresFixture, free_port, seed
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random, dict], dict]
+    # Admin operations are heavy; run fewer of them, one at a time
+    requests: Optional[int] = None
+    concurrency: Optional[int] = None
+    prepare: Optional[Callable[[httpx.AsyncClient, dict], Awaitable[None]]] = None
+
+def _get(url: str, **params) -> dict:
+    return {"method": "GET", "url": url, "params": params}
+
+async def _prepare_import(client: httpx.AsyncClient, data: dict):
+    for table in ("projects", "tasks"):
+        response = await client.get(f"/api/admin/export/{table}")
+        response.raise_for_status()
+        data[f"{table}_csv"] = response.content
+
+def _import(rng, data) -> dict:
+    return {
+        "method": "POST",
+        "url": "/api/admin/import/",
+        "params": {"on_conflict": "update"},
+        "files": [
+            ("files", ("projects_bench.csv", data["projects_csv"], "text/csv")),
+            ("files", ("tasks_bench.csv", data["tasks_csv"], "text/csv")),
+        ],
+    }
+
+def _batch(rng, data) -> dict:
+    ids = rng.sample(data["task_ids"], min(50, len(data["task_ids"])))
+    return {
+        "method": "POST",
+        "url": "/api/tasks/batch",
+        "json": {"operations": [
+            {"op": "update", "id": str(task_id), "completed": rng.random() < 0.5} for task_id in ids
+        ]},
+    }
+
+SCENARIOS = [
+    Scenario("projects.list", lambda rng, data: _get("/api/projects/", limit=20)),
+    Scenario("projects.summary", lambda rng, data: _get("/api/projects/", view="summary", limit=100)),
+    Scenario("projects.read", lambda rng, data: _get(f"/api/projects/{rng.choice(data['project_ids'])}")),
+    Scenario("projects.tasks", lambda rng, data: _get(f"/api/projects/{rng.choice(data['project_ids'])}/tasks", limit=100)),
+    Scenario("tasks.list", lambda rng, data: _get("/api/tasks/", limit=100)),
+    Scenario("tasks.read", lambda rng, data: _get(f"/api/tasks/{rng.choice(data['task_ids'])}")),
+    Scenario("tasks.search", lambda rng, data: _get("/api/tasks/search", q=" ".join(rng.sample(data["words"], 2)))),
+    Scenario("tasks.create", lambda rng, data: {
+        "method": "POST", "url": "/api/tasks/",
+        "json": {"title": "bench task", "project_id": str(rng.choice(data["project_ids"]))},
+    }),
+    Scenario("tasks.update", lambda rng, data: {
+        "method": "PUT", "url": f"/api/tasks/{rng.choice(data['task_ids'])}",
+        "json": {"completed": rng.random() < 0.5},
+    }),
+    Scenario("tasks.batch", _batch, requests=50),
+    Scenario("admin.export", lambda rng, data: _get("/api/admin/export/"), requests=5, concurrency=1),
+    Scenario("admin.export_table", lambda rng, data: _get("/api/admin/export/tasks", compress="true"), requests=5, concurrency=1),
+    Scenario("admin.import", _import, requests=5, concurrency=1, prepare=_prepare_import),
+]
+
+class QueryCounter:
+    """Counts statements sent to Postgres by the app's engines."""
+
+    def __init__(self):
+        self.count = 0
+
+    def install(self):
+        from sqlalchemy import event
+        from app.database import engine, read_engine, admin_engine
+        for target in {engine.sync_engine, read_engine.sync_engine, admin_engine.sync_engine}:
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+async def send(client: httpx.AsyncClient, request: dict) -> bool:
+    """Send a request; for queued admin jobs, wait until the job finishes. True on success."""
+    response = await client.request(**request)
+    if response.status_code != 202:
+        return response.status_code < 400
+    job_url = f"/api/admin/jobs/{response.json()['id']}"
+    while True:
+        job = (await client.get(job_url)).json()
+        if job["status"] not in ("queued", "running"):
+            return job["status"] == "succeeded"
+        await asyncio.sleep(0.05)
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+async def run_scenario(client, scenario: Scenario, data: dict, queries: QueryCounter, args) -> dict:
+    rng = random.Random(f"{args.seed}:{scenario.name}")
+    total = scenario.requests or args.requests
+    concurrency = min(scenario.concurrency or args.concurrency, total)
+    if scenario.prepare:
+        await scenario.prepare(client, data)
+    warmup = min(args.warmup, total)
+    requests = [scenario.build(rng, data) for _ in range(warmup + total)]
+    for request in requests[:warmup]:
+        await send(client, request)
+
+    latencies, errors = [], 0
+    pending = iter(requests[warmup:])
+
+    async def worker():
+        nonlocal errors
+        for request in pending:
+            started = time.perf_counter()
+            ok = await send(client, request)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    queries_before = queries.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "endpoint": scenario.name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "mean_ms": ms(sum(latencies) / len(latencies)),
+        "throughput_rps": round(total / elapsed, 2),
+        "queries_per_request": round((queries.count - queries_before) / total, 2),
+    }
+
+async def run_transport(transport: str, fixture: PostgresFixture, queries: QueryCounter, args) -> list:
+    from app.main import app
+    from app.utils.cache import response_cache
+
+    data = await seed(fixture.dsn, args.projects, args.tasks_per_project, args.standalone_tasks, args.seed)
+    await response_cache.clear()
+    scenarios = [s for s in SCENARIOS if not args.endpoints or s.name in args.endpoints]
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async def run_all(client) -> list:
+        results = []
+        for scenario in scenarios:
+            result = {"transport": transport, **await run_scenario(client, scenario, data, queries, args)}
+            print_row(result)
+            results.append(result)
+        return results
+
+    if transport == "asgi":
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None
+            ) as client:
+                return await run_all(client)
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            if serving.done():
+                serving.result()
+            await asyncio.sleep(0.05)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None
+        ) as client:
+            return await run_all(client)
+    finally:
+        server.should_exit = True
+        await serving
+
+def print_row(result: dict):
+    print(
+        f"{result['transport']:<8}{result['endpoint']:<22}"
+        f"p50 {result['p50_ms']:9.2f}  p95 {result['p95_ms']:9.2f}  p99 {result['p99_ms']:9.2f} ms  "
+        f"{result['throughput_rps']:9.1f} req/s  {result['queries_per_request']:6.2f} q/req"
+        + (f"  {result['errors']} errors" if result["errors"] else "")
+    )
+
+def compare(results: list, baseline_path: str, max_regression: Optional[float]) -> bool:
+    """Print p95/throughput changes against a baseline; False if p95 regressed past the limit."""
+    with open(baseline_path) as f:
+        baseline = {(r["transport"], r["endpoint"]): r for r in json.load(f)["results"]}
+    ok = True
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["transport"], result["endpoint"]))
+        if before is None:
+            continue
+        p95 = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        rps = (result["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+        flag = ""
+        if max_regression is not None and p95 > max_regression:
+            flag, ok = "  REGRESSION", False
+        print(f"{result['transport']:<8}{result['endpoint']:<22}p95 {p95:+7.1f}%  throughput {rps:+7.1f}%{flag}")
+    return ok
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def main(args) -> int:
+    # Settings are read at import time, so set them before the app is imported
+    os.environ["CACHE_ENABLED"] = "true" if args.cache else "false"
+    started_at = datetime.now(timezone.utc).isoformat()
+    async with PostgresFixture(args.db) as fixture:
+        queries = QueryCounter()
+        queries.install()
+        results = []
+        for transport in args.transports:
+            results += await run_transport(transport, fixture, queries, args)
+
+    report = {
+        "meta": {
+            "started_at": started_at,
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline and not compare(results, args.baseline, args.max_regression):
+        return 1
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", choices=["docker", "server"], default="docker",
+                        help="disposable container, or a scratch database on the .env server")
+    parser.add_argument("--transports", nargs="+", choices=["asgi", "uvicorn"], default=["asgi", "uvicorn"])
+    parser.add_argument("--endpoints", nargs="+", help="only run these scenarios, e.g. tasks.list")
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tasks-per-project", type=int, default=100)
+    parser.add_argument("--standalone-tasks", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="disable the response cache")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float,
+                        help="exit non-zero if any p95 is this many percent slower than the baseline")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,93 @@
+"""Compare the ORM + response_model read path with the plain-row JSON path.
+
+No database needed: rows are built in memory.
+
+    uv run python -m benchmarks.serialization
+"""
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from app.models.project import Project as ProjectModel
+from app.models.task import Task as TaskModel
+from app.schemas.project import Project
+from app.schemas.task import Task
+
+TASK_FIELDS = ("title", "description", "completed", "project_id", "id", "created_at", "updated_at")
+PROJECT_FIELDS = ("name", "description", "id", "created_at", "updated_at")
+
+def make_task(project_id, i: int) -> dict:
+    now = datetime.now(timezone.utc) - timedelta(seconds=i)
+    return {
+        "title": f"Task {i}",
+        "description": "Lorem ipsum dolor sit amet " * 3,
+        "completed": i % 3 == 0,
+        "project_id": project_id,
+        "id": uuid4(),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def make_projects(n_projects: int, tasks_per_project: int) -> List[dict]:
+    projects = []
+    for p in range(n_projects):
+        project_id = uuid4()
+        now = datetime.now(timezone.utc)
+        projects.append({
+            "name": f"Project {p}",
+            "description": "Benchmark project",
+            "id": project_id,
+            "created_at": now,
+            "updated_at": now,
+            "tasks": [make_task(project_id, i) for i in range(tasks_per_project)],
+        })
+    return projects
+
+def orm_project(project: dict) -> ProjectModel:
+    db_project = ProjectModel(**{name: project[name] for name in PROJECT_FIELDS})
+    db_project.tasks = [TaskModel(**task) for task in project["tasks"]]
+    return db_project
+
+def old_path(adapter: TypeAdapter, objects) -> bytes:
+    # What FastAPI does with response_model: validate from attributes, dump, then json-encode
+    validated = adapter.validate_python(objects, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+def new_path(rows) -> bytes:
+    return to_json(rows)
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def report(label: str, old: float, new: float):
+    print(f"{label:<28} old {old * 1000:8.2f} ms   new {new * 1000:8.2f} ms   {old / new:5.1f}x")
+
+def main(repeat: int = 5):
+    task_list = TypeAdapter(List[Task])
+    project_list = TypeAdapter(List[Project])
+    for n in (1_000, 10_000):
+        rows = [make_task(None, i) for i in range(n)]
+        orm = [TaskModel(**row) for row in rows]
+        assert json.loads(old_path(task_list, orm)) == json.loads(new_path(rows))
+        report(f"{n} tasks", timeit(lambda: old_path(task_list, orm), repeat), timeit(lambda: new_path(rows), repeat))
+
+        projects = make_projects(n // 100, 100)
+        orm = [orm_project(project) for project in projects]
+        report(
+            f"{n // 100} projects x 100 tasks",
+            timeit(lambda: old_path(project_list, orm), repeat),
+            timeit(lambda: new_path(projects), repeat),
+        )
+
+if __name__ == "__main__":
+    main()
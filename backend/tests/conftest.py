@@ -0,0 +1,47 @@
+"""Runs the API in-process against a throwaway Postgres (see benchmarks/fixture.py).
+
+TEST_DB=docker (default) starts a disposable container; TEST_DB=server uses a
+scratch database on the .env server. Tests are skipped when neither is available.
+"""
+import asyncio
+import os
+import re
+
+import pytest
+
+from benchmarks.fixture import PostgresFixture
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+@pytest.fixture(scope="session")
+def database():
+    fixture = PostgresFixture(os.getenv("TEST_DB", "docker"))
+    try:
+        asyncio.run(fixture.start())
+    except Exception as e:
+        pytest.skip(f"No test database: {e}")
+    # Must be set before the app is imported; query counts come from its profiling hook
+    os.environ.update({"PROFILING_ENABLED": "true", "SLOW_QUERY_EXPLAIN": "false", "CACHE_ENABLED": "false"})
+    yield fixture
+    asyncio.run(fixture.stop())
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def client(database):
+    import httpx
+    from app.main import app
+    from app.database import dispose_engines
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # The first checkout also initializes the dialect; keep that out of the counts
+        await client.get("/api/projects/stats")
+        yield client
+    # Pooled connections belong to this test's event loop
+    await dispose_engines()
+
+def query_count(response) -> int:
+    """SQL statements the request issued, as reported in its Server-Timing header."""
+    return int(SERVER_TIMING_QUERIES.search(response.headers["server-timing"]).group(1))
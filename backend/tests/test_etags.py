@@ -0,0 +1,26 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def test_project_list_etag_follows_access_order(client):
+    from app.utils.touches import touch_aggregator
+
+    first = (await client.post("/api/projects/", json={"name": "First"})).json()
+    await client.post("/api/projects/", json={"name": "Second"})
+    listed = await client.get("/api/projects/?limit=1")
+    etag = listed.headers["etag"]
+
+    # Viewing a project moves it to the front of the list without changing its content
+    await client.get(f"/api/projects/{first['id']}")
+    await touch_aggregator.flush()
+
+    response = await client.get("/api/projects/?limit=1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == first["id"]
+    assert response.headers["etag"] != etag
+
+async def test_project_list_etag_revalidates(client):
+    await client.post("/api/projects/", json={"name": "Project"})
+    etag = (await client.get("/api/projects/?limit=1")).headers["etag"]
+    response = await client.get("/api/projects/?limit=1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,24 @@
+import json
+from uuid import uuid4
+
+from app.utils.events import NOTIFY_MAX_BYTES, Subscription, _change_payloads
+
+def test_change_payloads_name_the_projects_of_their_ids():
+    project, other = str(uuid4()), str(uuid4())
+    changes = [(str(uuid4()), {project}) for _ in range(300)] + [(str(uuid4()), {other})]
+    payloads = _change_payloads("task", "create", changes)
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) < NOTIFY_MAX_BYTES for payload in payloads)
+
+    events = [json.loads(payload) for payload in payloads]
+    subscription = Subscription(project)
+    heard = {i for event in events if subscription.wants(event) for i in event["ids"]}
+    assert heard >= {change_id for change_id, _ in changes[:300]}
+    assert all(other in event["project_ids"] for event in events if changes[-1][0] in event["ids"])
+
+def test_change_payloads_keep_both_projects_of_a_move():
+    old, new = str(uuid4()), str(uuid4())
+    changes = [(str(uuid4()), {old, new}) for _ in range(300)]
+    for event in map(json.loads, _change_payloads("task", "update", changes)):
+        assert event["project_ids"] == sorted({old, new})
+        assert Subscription(old).wants(event) and Subscription(new).wants(event)
@@ -0,0 +1,39 @@
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from fastapi import UploadFile
+
+from app.models.task import Task
+from app.utils.admin import data_columns, iter_parquet_records
+from app.utils.parquet import ParquetFileWriter
+
+def _value(col, i):
+    python_type = col.type.python_type
+    if python_type is uuid.UUID:
+        return uuid.uuid4()
+    if python_type is bool:
+        return i % 2 == 0
+    if python_type is datetime:
+        return datetime.now(timezone.utc)
+    return f"{col.name} {i}"
+
+@pytest.mark.anyio
+async def test_parquet_progress_reaches_file_size(tmp_path):
+    columns = data_columns(Task)
+    path = str(tmp_path / "tasks.parquet")
+    writer = ParquetFileWriter(path, columns)
+    for _ in range(3):
+        writer.write([tuple(_value(col, i) for col in columns) for i in range(700)])
+    writer.close()
+
+    with open(path, "rb") as file:
+        upload = UploadFile(file, filename="tasks.parquet")
+        positions = [read async for _, _, read in iter_parquet_records(Task, upload, batch_size=500)]
+    assert positions == sorted(positions)
+    assert positions[0] < os.path.getsize(path) / 2
+    assert positions[-1] == os.path.getsize(path)
@@ -0,0 +1,69 @@
+import pytest
+
+from .conftest import query_count
+
+pytestmark = pytest.mark.anyio
+
+async def create_project(client) -> dict:
+    response = await client.post("/api/projects/", json={"name": "Project", "description": "About"})
+    assert response.status_code == 200
+    return response.json()
+
+async def test_create_project(client):
+    response = await client.post("/api/projects/", json={"name": "Project"})
+    assert response.status_code == 200
+    # INSERT ... RETURNING, pg_notify
+    assert query_count(response) == 2
+
+async def test_update_project(client):
+    project = await create_project(client)
+    response = await client.put(f"/api/projects/{project['id']}", json={"name": "Renamed"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    # UPDATE ... RETURNING, its tasks, pg_notify
+    assert query_count(response) == 3
+
+async def test_create_task(client):
+    response = await client.post("/api/tasks/", json={"title": "Task"})
+    assert response.status_code == 200
+    # INSERT ... RETURNING, pg_notify
+    assert query_count(response) == 2
+
+async def test_update_task(client):
+    task = (await client.post("/api/tasks/", json={"title": "Task"})).json()
+    response = await client.put(f"/api/tasks/{task['id']}", json={"title": "Renamed", "completed": True})
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+    # UPDATE ... RETURNING, pg_notify
+    assert query_count(response) == 2
+
+async def test_update_task_move(client):
+    project = await create_project(client)
+    task = (await client.post("/api/tasks/", json={"title": "Task"})).json()
+    response = await client.put(f"/api/tasks/{task['id']}", json={"project_id": project["id"]})
+    assert response.status_code == 200
+    # Old project id (for invalidation), UPDATE ... RETURNING, pg_notify
+    assert query_count(response) == 3
+
+async def test_create_project_task(client):
+    project = await create_project(client)
+    response = await client.post(f"/api/projects/{project['id']}/tasks", json={"title": "Task"})
+    assert response.status_code == 200
+    assert response.json()["project_id"] == project["id"]
+    # The foreign key checks the project: INSERT ... RETURNING, pg_notify
+    assert query_count(response) == 2
+
+async def test_create_project_task_missing_project(client):
+    response = await client.post(
+        "/api/projects/00000000-0000-4000-8000-000000000000/tasks", json={"title": "Task"}
+    )
+    # No existence check up front: the failed INSERT is the only statement
+    assert response.status_code == 404
+
+async def test_update_task_missing_project(client):
+    task = (await client.post("/api/tasks/", json={"title": "Task"})).json()
+    response = await client.put(
+        f"/api/tasks/{task['id']}", json={"project_id": "00000000-0000-4000-8000-000000000000"}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Project not found"
@@ -0,0 +1,77 @@
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.task import TaskBatch
+
+MISSING = "00000000-0000-4000-8000-000000000000"
+
+def test_batch_rejects_duplicate_updates():
+    task_id = str(uuid4())
+    with pytest.raises(ValidationError, match=task_id):
+        TaskBatch.model_validate({"operations": [
+            {"op": "update", "id": task_id, "title": "A"},
+            {"op": "update", "id": task_id, "title": "B"},
+        ]})
+
+def test_batch_rejects_update_and_delete_of_one_task():
+    task_id = str(uuid4())
+    with pytest.raises(ValidationError, match=task_id):
+        TaskBatch.model_validate({"operations": [
+            {"op": "update", "id": task_id, "completed": True},
+            {"op": "delete", "id": task_id},
+        ]})
+
+def test_batch_accepts_distinct_ids():
+    batch = TaskBatch.model_validate({"operations": [
+        {"op": "create", "title": "New"},
+        {"op": "update", "id": str(uuid4()), "completed": True},
+        {"op": "delete", "id": str(uuid4())},
+    ]})
+    assert [op.op for op in batch.operations] == ["create", "update", "delete"]
+
+@pytest.mark.anyio
+async def test_batch_results_follow_operation_order(client):
+    project = (await client.post("/api/projects/", json={"name": "Project"})).json()
+    kept = (await client.post("/api/tasks/", json={"title": "Kept"})).json()
+    dropped = (await client.post("/api/tasks/", json={"title": "Dropped"})).json()
+    response = await client.post("/api/tasks/batch", json={"operations": [
+        {"op": "delete", "id": dropped["id"]},
+        {"op": "create", "title": "First", "project_id": project["id"]},
+        {"op": "update", "id": kept["id"], "completed": True},
+        {"op": "update", "id": MISSING, "completed": True},
+        {"op": "create", "title": "Second"},
+        {"op": "delete", "id": MISSING},
+    ]})
+    assert response.status_code == 200
+    results = response.json()
+    assert [(r["op"], r["ok"]) for r in results] == [
+        ("delete", True), ("create", True), ("update", True), ("update", False), ("create", True), ("delete", False),
+    ]
+    assert results[1]["task"]["title"] == "First" and results[1]["task"]["project_id"] == project["id"]
+    assert results[2]["task"]["completed"] is True
+    assert results[3]["detail"] == results[5]["detail"] == "Task not found"
+    assert results[4]["task"]["title"] == "Second"
+    assert (await client.get(f"/api/tasks/{dropped['id']}")).status_code == 404
+
+@pytest.mark.anyio
+async def test_batch_missing_project_writes_nothing(client):
+    task = (await client.post("/api/tasks/", json={"title": "Task"})).json()
+    response = await client.post("/api/tasks/batch", json={"operations": [
+        {"op": "update", "id": task["id"], "title": "Renamed"},
+        {"op": "create", "title": "Orphan", "project_id": MISSING},
+    ]})
+    assert response.status_code == 404
+    assert MISSING in response.json()["detail"]
+    assert (await client.get(f"/api/tasks/{task['id']}")).json()["title"] == "Task"
+
+@pytest.mark.anyio
+async def test_batch_rejects_conflicting_operations(client):
+    task = (await client.post("/api/tasks/", json={"title": "Task"})).json()
+    response = await client.post("/api/tasks/batch", json={"operations": [
+        {"op": "update", "id": task["id"], "completed": True},
+        {"op": "delete", "id": task["id"]},
+    ]})
+    assert response.status_code == 422
+    assert (await client.get(f"/api/tasks/{task['id']}")).status_code == 200